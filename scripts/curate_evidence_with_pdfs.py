@@ -30,6 +30,28 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
 from communitymech.literature_enhanced import EnhancedLiteratureFetcher
 
+# Prefixes allowed by the EvidenceItem.reference pattern, plus common malformed variants
+REFERENCE_PREFIXES = ("PMID:", "doi:", "bioproject:")
+BARE_DOI_PATTERN = re.compile(r"^10\.\d+/")
+BARE_PMC_PATTERN = re.compile(r"^PMC\d+$")
+
+# Phrasings typical of paraphrased rather than quoted snippets
+AI_SNIPPET_PATTERNS = [
+    (pattern, re.compile(pattern, re.IGNORECASE))
+    for pattern in (
+        "is an? (important|key|critical)",
+        "plays an? (important|key|critical) role",
+        "has been shown to",
+        "it is (known|believed) that",
+    )
+]
+
+SENTENCE_SPLIT_PATTERN = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+JOURNAL_CITATION_PATTERN = re.compile(r'^[A-Z][a-z]+ [A-Z][a-z]+\.\s+\d{4}')
+KEYWORD_PATTERN = re.compile(r'\b\w{4,}\b')
+NUMBERED_CITATION_PATTERN = re.compile(r'\[\d+\]')
+AUTHOR_YEAR_CITATION_PATTERN = re.compile(r'\([A-Za-z\s,]+\d{4}\)')
+
 
 @dataclass
 class EvidenceIssue:
@@ -60,16 +82,15 @@ class EvidenceCurator:
         """Validate reference matches schema pattern"""
 
         # Check pattern: Must start with PMID:, doi:, or bioproject:
-        pattern = r"^(PMID:|doi:|bioproject:)"
-        if not re.match(pattern, reference):
+        if not reference.startswith(REFERENCE_PREFIXES):
             # Try to fix common issues
             if reference.startswith("pmid:"):
                 return False, f"PMID:{reference[5:]}"
             elif reference.startswith("DOI:"):
                 return False, f"doi:{reference[4:]}"
-            elif re.match(r"^10\.\d+/", reference):
+            elif BARE_DOI_PATTERN.match(reference):
                 return False, f"doi:{reference}"
-            elif re.match(r"^PMC\d+$", reference):
+            elif BARE_PMC_PATTERN.match(reference):
                 return False, f"PMID:{reference}"
             else:
                 return False, None
@@ -96,14 +117,8 @@ class EvidenceCurator:
             issues.append("Snippet is truncated but very short")
 
         # Check for AI-generated patterns
-        ai_patterns = [
-            "is an? (important|key|critical)",
-            "plays an? (important|key|critical) role",
-            "has been shown to",
-            "it is (known|believed) that",
-        ]
-        for pattern in ai_patterns:
-            if re.search(pattern, snippet, re.IGNORECASE):
+        for pattern, regex in AI_SNIPPET_PATTERNS:
+            if regex.search(snippet):
                 issues.append(f"Snippet may be AI-generated/paraphrased (pattern: {pattern})")
                 break
 
@@ -205,12 +220,12 @@ class EvidenceCurator:
         """Extract best matching snippet from text"""
 
         # Split into sentences
-        sentences = re.split(r'(?<=[.!?])\s+(?=[A-Z])', text)
+        sentences = SENTENCE_SPLIT_PATTERN.split(text)
 
         # Filter out journal citation lines
         sentences = [
             s for s in sentences
-            if not re.match(r'^[A-Z][a-z]+ [A-Z][a-z]+\.\s+\d{4}', s)  # Journal citation
+            if not JOURNAL_CITATION_PATTERN.match(s)  # Journal citation
             and len(s) > 50  # Substantive
         ]
 
@@ -233,7 +248,7 @@ class EvidenceCurator:
         # Try to find sentence with keywords from current snippet
         if current_snippet:
             keywords = [
-                w for w in re.findall(r'\b\w{4,}\b', current_snippet.lower())
+                w for w in KEYWORD_PATTERN.findall(current_snippet.lower())
                 if w not in ['that', 'with', 'from', 'this', 'were', 'have']
             ][:5]  # Top 5 keywords
 
@@ -255,8 +270,8 @@ class EvidenceCurator:
     def _clean_snippet(self, text: str) -> str:
         """Clean snippet for use in YAML"""
         # Remove citations
-        text = re.sub(r'\[\d+\]', '', text)
-        text = re.sub(r'\([A-Za-z\s,]+\d{4}\)', '', text)
+        text = NUMBERED_CITATION_PATTERN.sub('', text)
+        text = AUTHOR_YEAR_CITATION_PATTERN.sub('', text)
         # Remove excess whitespace
         text = ' '.join(text.split())
         return text
@@ -13,6 +13,9 @@ import re
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+BARE_PMC_PATTERN = re.compile(r'^PMC\d+$')
+BARE_DOI_PATTERN = re.compile(r'^10\.\d+/')
+
 
 def fix_reference(ref: str) -> Tuple[str, bool]:
     """
@@ -27,7 +30,7 @@ def fix_reference(ref: str) -> Tuple[str, bool]:
         ref = 'PMID:' + ref[5:]
 
     # Fix PMC without prefix
-    if re.match(r'^PMC\d+$', ref):
+    if BARE_PMC_PATTERN.match(ref):
         ref = 'PMID:' + ref
 
     # Fix uppercase DOI
@@ -35,7 +38,7 @@ def fix_reference(ref: str) -> Tuple[str, bool]:
         ref = 'doi:' + ref[4:]
 
     # Fix doi without prefix (if looks like DOI pattern)
-    if re.match(r'^10\.\d+/', ref):
+    if BARE_DOI_PATTERN.match(ref):
         ref = 'doi:' + ref
 
     return (ref, ref != original)
@@ -13,22 +13,98 @@ Tests all 6 tiers of the PDF cascade:
 Validates configuration, success rates, and fallback behavior.
 """
 
+import json
+import os
 import sys
 import yaml
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from collections import defaultdict
+from itertools import islice
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
+from communitymech.literature import create_session
 from communitymech.literature_enhanced import EnhancedLiteratureFetcher
 
+# Resolved PDF URLs are reused across runs for a week
+PDF_URL_CACHE_FILE = Path('.literature_cache') / 'pdf_url_cache.json'
+PDF_URL_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Every cascade queries the same Unpaywall, Semantic Scholar, PMC and mirror
+# hosts whatever the publisher, so cascade starts share one limiter key
+CASCADE_HOST_KEY = 'cascade'
+
+EVIDENCE_SECTIONS = ('taxonomy', 'ecological_interactions', 'environmental_factors')
+
+
+def iter_evidence_references(stream):
+    """
+    Yield evidence `reference` values from a community YAML stream.
+
+    Walks the parser's event stream instead of building the document, so
+    only the scalars under <section>[*].evidence[*].reference are kept.
+    """
+
+    # One frame per open collection: [is_mapping, current_key, expecting_key]
+    stack = []
+
+    for event in yaml.parse(stream, Loader=SafeLoader):
+        if isinstance(event, (yaml.MappingStartEvent, yaml.SequenceStartEvent)):
+            stack.append([isinstance(event, yaml.MappingStartEvent), None, True])
+            continue
+
+        if isinstance(event, (yaml.MappingEndEvent, yaml.SequenceEndEvent)):
+            stack.pop()
+        elif isinstance(event, yaml.ScalarEvent):
+            if stack and stack[-1][0] and stack[-1][2]:
+                stack[-1][1] = event.value
+                stack[-1][2] = False
+                continue
+
+            if stack and stack[-1][1] == 'reference':
+                keys = [frame[1] for frame in stack if frame[0]]
+                if len(keys) == 3 and keys[0] in EVIDENCE_SECTIONS and keys[1] == 'evidence':
+                    yield event.value
+        elif not isinstance(event, yaml.AliasEvent):
+            continue
+
+        # A value (scalar, alias or collection) just ended; next scalar is a key
+        if stack and stack[-1][0]:
+            stack[-1][2] = True
+
+
+class HostLimiter:
+    """Per-host rate limiter: only back-to-back requests to the same host wait"""
+
+    def __init__(self, rps: float = 1.0):
+        self.rps = rps
+        self.next_allowed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host: str):
+        # Reserve the next slot under the lock, sleep outside it
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self.next_allowed.get(host, 0.0))
+            self.next_allowed[host] = start + 1 / self.rps
+
+        if start > now:
+            time.sleep(start - now)
+
 
 class PDFFetchingTester:
     """Comprehensive PDF fetching test suite"""
 
-    def __init__(self):
+    def __init__(self, use_cache: bool = True):
         # Test with fallback enabled
         self.fetcher_with_fallback = EnhancedLiteratureFetcher(
             cache_dir=".literature_cache",
@@ -41,6 +117,11 @@ class PDFFetchingTester:
             use_fallback_pdf=False
         )
 
+        # Share one pooled keep-alive session so both fetchers reuse connections
+        session = create_session()
+        self.fetcher_with_fallback.session = session
+        self.fetcher_no_fallback.session = session
+
         self.results = {
             'publisher': [],
             'pmc': [],
@@ -50,46 +131,68 @@ class PDFFetchingTester:
             'web_search': [],
             'failed': []
         }
+        self.total_success = 0
 
-    def extract_dois_from_kb(self, max_dois: int = 20) -> List[str]:
-        """Extract sample DOIs from knowledge base"""
+        self.use_cache = use_cache
+        self.url_cache = self._load_url_cache() if use_cache else {}
+        self.limiter = HostLimiter(rps=1.0)
 
-        kb_dir = Path('kb/communities')
-        yaml_files = sorted(kb_dir.glob('*.yaml'))
+    def _load_url_cache(self) -> Dict[str, Dict]:
+        """Load previously resolved PDF URLs from disk"""
 
-        dois = []
-        seen = set()
+        if not PDF_URL_CACHE_FILE.exists():
+            return {}
+
+        try:
+            return json.loads(PDF_URL_CACHE_FILE.read_text())
+        except (OSError, ValueError) as e:
+            print(f"  Warning: ignoring unreadable PDF URL cache: {e}")
+            return {}
+
+    def _save_url_cache(self):
+        """Persist resolved PDF URLs to disk"""
+
+        if not self.use_cache:
+            return
 
-        for yaml_path in yaml_files:
-            if len(dois) >= max_dois:
-                break
+        PDF_URL_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        PDF_URL_CACHE_FILE.write_text(json.dumps(self.url_cache, indent=2))
 
-            with open(yaml_path, 'r') as f:
-                data = yaml.safe_load(f)
+    def _cached_pdf_url(self, doi: str, use_fallback: bool) -> Optional[Tuple[str, str]]:
+        """Return a cached (pdf_url, source_tier) if it has not expired"""
 
-            # Check all evidence
-            for section in ['taxonomy', 'ecological_interactions', 'environmental_factors']:
-                if section not in data:
-                    continue
+        if not self.use_cache:
+            return None
 
-                items = data[section]
-                for item in items:
-                    if 'evidence' not in item:
-                        continue
+        entry = self.url_cache.get(f"{doi}|{use_fallback}")
+        if entry and time.time() - entry['fetched_at'] < PDF_URL_CACHE_TTL:
+            return (entry['pdf_url'], entry['source'])
+        return None
 
-                    for ev in item['evidence']:
-                        ref = ev.get('reference', '')
+    def _iter_dois(self):
+        """Yield unique DOIs cited as evidence in the knowledge base, in file order"""
 
-                        if ref.startswith('doi:'):
-                            doi = ref[4:]
-                            if doi not in seen:
-                                dois.append(doi)
-                                seen.add(doi)
+        with os.scandir('kb/communities') as entries:
+            yaml_paths = [
+                entry.path for entry in entries
+                if entry.name.endswith('.yaml') and entry.is_file(follow_symlinks=False)
+            ]
+        yaml_paths.sort()
 
-                                if len(dois) >= max_dois:
-                                    return dois
+        seen = set()
+        for yaml_path in yaml_paths:
+            with open(yaml_path, 'rb') as f:
+                for ref in iter_evidence_references(f):
+                    if ref.startswith('doi:'):
+                        doi = ref[4:]
+                        if doi not in seen:
+                            seen.add(doi)
+                            yield doi
 
-        return dois
+    def extract_dois_from_kb(self, max_dois: int = 20) -> List[str]:
+        """Extract sample DOIs from knowledge base"""
+
+        return list(islice(self._iter_dois(), max_dois))
 
     def test_single_doi(self, doi: str, use_fallback: bool = False) -> Tuple[Optional[str], Optional[str]]:
         """
@@ -110,30 +213,60 @@ class PDFFetchingTester:
             print(f"  Error: {e}")
             return (None, None)
 
-    def test_cascade(self, dois: List[str], use_fallback: bool = True):
-        """Test PDF cascade for multiple DOIs"""
+    def _resolve_doi(self, doi: str, use_fallback: bool) -> Tuple[Optional[str], Optional[str], bool]:
+        """
+        Resolve a DOI from the URL cache or through the cascade.
+
+        Returns: (pdf_url, source_tier, from_cache)
+        """
+
+        cached = self._cached_pdf_url(doi, use_fallback)
+        if cached:
+            return (*cached, True)
+
+        # The shared API hosts keep a 1/rps floor across all workers;
+        # cache hits above never wait
+        self.limiter.wait(CASCADE_HOST_KEY)
+        pdf_url, source = self.test_single_doi(doi, use_fallback)
+
+        if source and self.use_cache:
+            self.url_cache[f"{doi}|{use_fallback}"] = {
+                'pdf_url': pdf_url,
+                'source': source,
+                'fetched_at': time.time()
+            }
+
+        return (pdf_url, source, False)
+
+    def test_cascade(self, dois: List[str], use_fallback: bool = True, max_workers: int = 4):
+        """Test PDF cascade for multiple DOIs, resolving up to max_workers DOIs concurrently"""
 
         print(f"\nTesting {'WITH' if use_fallback else 'WITHOUT'} fallback mirrors...")
         print("=" * 80)
 
-        for i, doi in enumerate(dois, 1):
-            print(f"\n[{i}/{len(dois)}] Testing {doi}")
-            print("-" * 80)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            resolved = executor.map(lambda doi: self._resolve_doi(doi, use_fallback), dois)
 
-            pdf_url, source = self.test_single_doi(doi, use_fallback)
+            # Results arrive in input order, so the report reads like a sequential run
+            for i, (doi, (pdf_url, source, from_cache)) in enumerate(zip(dois, resolved), 1):
+                print(f"\n[{i}/{len(dois)}] Testing {doi}")
+                print("-" * 80)
 
-            if source:
-                self.results[source].append({
-                    'doi': doi,
-                    'pdf_url': pdf_url
-                })
-                print(f"✓ SUCCESS via {source}")
-            else:
-                self.results['failed'].append(doi)
-                print(f"✗ FAILED - No PDF found")
+                if from_cache:
+                    print("  (cached)")
+
+                if source:
+                    self.results[source].append({
+                        'doi': doi,
+                        'pdf_url': pdf_url
+                    })
+                    self.total_success += 1
+                    print(f"✓ SUCCESS via {source}")
+                else:
+                    self.results['failed'].append(doi)
+                    print(f"✗ FAILED - No PDF found")
 
-            # Rate limit
-            time.sleep(1)
+        self._save_url_cache()
 
     def test_scihub_config(self):
         """Test scihub fallback configuration"""
@@ -204,7 +337,7 @@ class PDFFetchingTester:
         print("PDF FETCHING TEST RESULTS")
         print("=" * 80)
 
-        total = sum(len(items) for source, items in self.results.items() if source != 'failed')
+        total = self.total_success
         total_tested = total + len(self.results['failed'])
 
         print(f"\nTotal DOIs tested: {total_tested}")
@@ -279,9 +412,11 @@ def main():
     parser.add_argument('--full', action='store_true', help="Full test with 20 DOIs")
     parser.add_argument('--no-fallback', action='store_true', help="Test without scihub fallback")
     parser.add_argument('--config-only', action='store_true', help="Only test configuration")
+    parser.add_argument('--no-cache', action='store_true', help="Ignore cached PDF URLs and refetch")
+    parser.add_argument('--workers', type=int, default=4, help="DOIs to resolve concurrently")
     args = parser.parse_args()
 
-    tester = PDFFetchingTester()
+    tester = PDFFetchingTester(use_cache=not args.no_cache)
 
     print("PDF FETCHING CORE CAPABILITY TEST")
     print("=" * 80)
@@ -313,7 +448,7 @@ def main():
 
     # Test with/without fallback
     use_fallback = not args.no_fallback
-    tester.test_cascade(dois, use_fallback=use_fallback)
+    tester.test_cascade(dois, use_fallback=use_fallback, max_workers=args.workers)
 
     # Test publisher patterns
     tester.test_specific_publishers()
@@ -336,7 +471,7 @@ def main():
         print("  - Test individual mirrors manually")
         print("  - Update HTML parsing patterns if needed")
 
-    success_rate = 100 * sum(len(items) for source, items in tester.results.items() if source != 'failed') / len(dois)
+    success_rate = 100 * tester.total_success / len(dois)
 
     if success_rate < 50:
         print("\n⚠ Low success rate detected")
@@ -9,12 +9,22 @@ This script:
 4. Generates a detailed validation report with suggestions for corrections
 """
 
+import codecs
+import io
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, TextIO
 import yaml
-from collections import defaultdict
+from itertools import groupby
+from operator import itemgetter
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
 
 try:
     from oaklib import get_adapter
@@ -24,12 +34,20 @@ except ImportError:
     sys.exit(1)
 
 
+ADAPTER_SELECTOR = "sqlite:obo:ncbitaxon"
+NCBI_PREFIX = 'NCBITaxon:'
+
+# Names per label query, well under SQLite's bound-parameter limit
+LABEL_QUERY_BATCH = 500
+
+
 class NCBITaxonValidator:
     """Validates NCBITaxon IDs using OAK"""
 
     def __init__(self, communities_dir: str):
         self.communities_dir = Path(communities_dir)
         self.adapter = None
+        self._local = threading.local()
         self.results = {
             'matches': [],
             'mismatches': [],
@@ -37,6 +55,7 @@ class NCBITaxonValidator:
             'errors': []
         }
         self.taxa_data = []
+        self._name_index = None
 
     def initialize_adapter(self):
         """Initialize OAK adapter for NCBITaxon"""
@@ -44,7 +63,8 @@ class NCBITaxonValidator:
         print("This may take a few minutes on first run to download the database...")
 
         try:
-            self.adapter = get_adapter("sqlite:obo:ncbitaxon")
+            self.adapter = get_adapter(ADAPTER_SELECTOR)
+            self._local.adapter = self.adapter
             print("✓ NCBITaxon adapter initialized successfully\n")
         except Exception as e:
             print(f"ERROR: Failed to initialize OAK adapter: {e}")
@@ -59,8 +79,17 @@ class NCBITaxonValidator:
         taxa = []
 
         try:
-            with open(yaml_file, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+            with open(yaml_file, 'rb') as f:
+                raw = f.read()
+
+            # Skip the YAML parser entirely for files without a top-level taxonomy
+            # key; a UTF-8 BOM may precede the first line
+            if raw.startswith(codecs.BOM_UTF8):
+                raw = raw[len(codecs.BOM_UTF8):]
+            if not raw.startswith(b'taxonomy:') and b'\ntaxonomy:' not in raw:
+                return taxa
+
+            data = yaml.load(raw, Loader=SafeLoader)
 
             if not data or 'taxonomy' not in data:
                 return taxa
@@ -74,7 +103,7 @@ class NCBITaxonValidator:
                     taxon_id = term.get('id', '')
                     term_label = term.get('label', '')
 
-                    if taxon_id and taxon_id.startswith('NCBITaxon:'):
+                    if taxon_id and taxon_id.startswith(NCBI_PREFIX):
                         taxa.append({
                             'preferred_term': preferred_term,
                             'taxon_id': taxon_id,
@@ -91,54 +120,92 @@ class NCBITaxonValidator:
         """Extract taxa from all YAML files"""
         print(f"Scanning YAML files in {self.communities_dir}...")
 
-        yaml_files = list(self.communities_dir.glob("*.yaml"))
+        with os.scandir(self.communities_dir) as entries:
+            yaml_files = [
+                entry.path for entry in entries
+                if entry.name.endswith('.yaml') and entry.is_file()
+            ]
+        yaml_files.sort()
         print(f"Found {len(yaml_files)} YAML files\n")
 
-        for yaml_file in sorted(yaml_files):
-            taxa = self.extract_taxa_from_yaml(yaml_file)
+        for yaml_file in yaml_files:
+            taxa = self.extract_taxa_from_yaml(Path(yaml_file))
             self.taxa_data.extend(taxa)
 
         print(f"Extracted {len(self.taxa_data)} NCBITaxon IDs from {len(yaml_files)} files\n")
 
-    def validate_taxon(self, taxon_data: Dict) -> Tuple[str, Optional[str], Optional[str]]:
+    def _build_name_index(self, names: List[str]) -> Dict[str, List[str]]:
         """
-        Validate a single taxon ID
+        Map each lowercase species name to the NCBITaxon CURIEs labelled with it.
 
-        Returns:
-            (status, oak_label, suggested_id)
-            status: 'match', 'mismatch', 'missing', or 'error'
+        Only the given names are looked up, in batches, rather than reading
+        every label in the database. Homonyms map to more than one CURIE.
         """
-        taxon_id = taxon_data['taxon_id']
-        preferred_term = taxon_data['preferred_term']
+        index = {}
 
         try:
-            # Get label from OAK
-            oak_label = self.adapter.label(taxon_id)
-
-            if oak_label is None:
-                return ('missing', None, None)
-
-            # Check if labels match (case-insensitive comparison)
-            if oak_label.lower() == preferred_term.lower():
-                return ('match', oak_label, None)
-            else:
-                # Try to find correct ID
-                suggested_id = self.find_correct_id(preferred_term)
-                return ('mismatch', oak_label, suggested_id)
-
+            from sqlalchemy import bindparam, text
+
+            query = text(
+                "SELECT subject, value FROM rdfs_label_statement "
+                "WHERE value IN :names AND subject LIKE 'NCBITaxon:%'"
+            ).bindparams(bindparam('names', expanding=True))
+            unique_names = list(dict.fromkeys(names))
+            with self.adapter.engine.connect() as conn:
+                for start in range(0, len(unique_names), LABEL_QUERY_BATCH):
+                    batch = unique_names[start:start + LABEL_QUERY_BATCH]
+                    for subject, value in conn.execute(query, {'names': batch}):
+                        index.setdefault(value.lower(), []).append(subject)
         except Exception as e:
-            return ('error', None, str(e))
+            # Not a SQL-backed adapter; every lookup falls back to basic_search
+            print(f"WARNING: Could not build label index, using search only: {e}")
+
+        for subjects in index.values():
+            subjects.sort()
+        return index
+
+    def _homonyms(self, species_name: str) -> List[str]:
+        """Return the CURIEs of every taxon labelled with this name, if there are several"""
+        subjects = (self._name_index or {}).get(species_name.lower(), [])
+        return subjects if len(subjects) > 1 else []
+
+    def _thread_adapter(self):
+        """Return this thread's OAK adapter (SQLite connections are not shared across threads)"""
+        adapter = getattr(self._local, 'adapter', None)
+        if adapter is None:
+            adapter = get_adapter(ADAPTER_SELECTOR)
+            self._local.adapter = adapter
+        return adapter
+
+    def _suggest(self, species_name: str) -> Tuple[Optional[str], Optional[str]]:
+        """Find a suggested (ID, label) for a species name; safe to call from worker threads"""
+        suggested_id = self.find_correct_id(species_name)
+        if not suggested_id:
+            return (None, None)
+        return (suggested_id, self._thread_adapter().label(suggested_id))
 
     def find_correct_id(self, species_name: str) -> Optional[str]:
         """Try to find the correct NCBITaxon ID for a species name"""
+        # Exact label hit; validate_all_taxa indexes every name it needs up front
+        index = self._name_index
+        if index is None:
+            index = self._build_name_index([species_name])
+
+        exact_ids = index.get(species_name.lower())
+        if exact_ids:
+            # A homonym has no single right ID; the report lists the candidates
+            return exact_ids[0] if len(exact_ids) == 1 else None
+
         try:
-            # Search for the species name in NCBITaxon
-            results = list(self.adapter.basic_search(species_name, config=None))
+            adapter = self._thread_adapter()
+
+            # Search for the species name in NCBITaxon (synonyms, partial names)
+            results = list(adapter.basic_search(species_name, config=None))
 
             if results:
                 # Return the first exact match or best match
                 for result in results[:3]:  # Check top 3 results
-                    label = self.adapter.label(result)
+                    label = adapter.label(result)
                     if label and label.lower() == species_name.lower():
                         return result
 
@@ -150,41 +217,96 @@ class NCBITaxonValidator:
 
         return None
 
-    def validate_all_taxa(self):
+    def validate_all_taxa(self, max_workers: Optional[int] = None):
         """Validate all extracted taxa"""
         print("Validating NCBITaxon IDs...\n")
 
-        total = len(self.taxa_data)
-        for i, taxon_data in enumerate(self.taxa_data, 1):
+        # Phase 1: resolve the OAK label once per unique taxon ID; common taxa
+        # (E. coli, B. subtilis, ...) recur across many community files
+        unique_ids = list(dict.fromkeys(t['taxon_id'] for t in self.taxa_data))
+        total = len(unique_ids)
+        label_map = {}
+        id_errors = {}
+        for i, taxon_id in enumerate(unique_ids, 1):
             if i % 10 == 0 or i == total:
-                print(f"Progress: {i}/{total} taxa validated", end='\r')
-
-            status, oak_label, suggested_id = self.validate_taxon(taxon_data)
+                print(f"Progress: {i}/{total} unique taxon IDs validated", end='\r')
+
+            try:
+                label_map[taxon_id] = self.adapter.label(taxon_id)
+            except Exception as e:
+                label_map[taxon_id] = None
+                id_errors[taxon_id] = str(e)
+
+        oak_labels = [label_map[t['taxon_id']] for t in self.taxa_data]
+        lookup_errors = {
+            idx: id_errors[t['taxon_id']]
+            for idx, t in enumerate(self.taxa_data)
+            if t['taxon_id'] in id_errors
+        }
 
+        # Phase 2: compare all labels (case-insensitive) in a single pass
+        match_mask = [
+            oak_label is not None and oak_label.lower() == taxon_data['preferred_term'].lower()
+            for taxon_data, oak_label in zip(self.taxa_data, oak_labels)
+        ]
+
+        # Phase 3: search for suggestions for mismatched/missing names in parallel;
+        # OAK's SQLite queries release the GIL, so threads overlap well
+        need_search = [
+            idx for idx, is_match in enumerate(match_mask)
+            if not is_match and idx not in lookup_errors
+        ]
+        suggestion_map = {}
+        if need_search:
+            names = list(
+                dict.fromkeys(self.taxa_data[idx]['preferred_term'] for idx in need_search)
+            )
+
+            # Build the shared name index before any worker needs it
+            self._name_index = self._build_name_index(names)
+            with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+                suggestion_map = dict(zip(names, executor.map(self._suggest, names)))
+
+        # Phase 4: classify
+        for idx, (taxon_data, oak_label, is_match) in enumerate(
+            zip(self.taxa_data, oak_labels, match_mask)
+        ):
             result_data = {
                 **taxon_data,
                 'oak_label': oak_label,
-                'suggested_id': suggested_id
+                'suggested_id': None,
+                'suggested_label': None,
+                'homonyms': [],
             }
 
-            if status == 'match':
-                self.results['matches'].append(result_data)
-            elif status == 'mismatch':
-                self.results['mismatches'].append(result_data)
-            elif status == 'missing':
-                self.results['missing'].append(result_data)
-            else:  # error
-                result_data['error'] = suggested_id  # suggested_id contains error message
+            if idx in lookup_errors:
+                result_data['error'] = lookup_errors[idx]
                 self.results['errors'].append(result_data)
+            elif is_match:
+                self.results['matches'].append(result_data)
+            else:
+                # Suggestions are resolved here so generate_report is pure formatting
+                result_data['suggested_id'], result_data['suggested_label'] = (
+                    suggestion_map[taxon_data['preferred_term']]
+                )
+                result_data['homonyms'] = self._homonyms(taxon_data['preferred_term'])
+
+                if oak_label is None:
+                    self.results['missing'].append(result_data)
+                else:
+                    self.results['mismatches'].append(result_data)
 
         print(f"\nValidation complete!\n")
 
-    def generate_report(self):
-        """Generate a detailed validation report"""
-        print("=" * 80)
-        print("NCBITaxon ID Validation Report")
-        print("=" * 80)
-        print()
+    def generate_report(self, out: Optional[TextIO] = None):
+        """Generate a detailed validation report, written to `out` (default: stdout)"""
+        if out is None:
+            out = sys.stdout
+
+        print("=" * 80, file=out)
+        print("NCBITaxon ID Validation Report", file=out)
+        print("=" * 80, file=out)
+        print(file=out)
 
         # Summary statistics
         total = len(self.taxa_data)
@@ -193,133 +315,161 @@ class NCBITaxonValidator:
         missing = len(self.results['missing'])
         errors = len(self.results['errors'])
 
-        print("SUMMARY")
-        print("-" * 80)
-        print(f"Total taxa checked:      {total}")
-        print(f"✓ Matching IDs:          {matches} ({matches/total*100:.1f}%)")
-        print(f"✗ Mismatched IDs:        {mismatches} ({mismatches/total*100:.1f}%)")
-        print(f"? Missing/Invalid IDs:   {missing} ({missing/total*100:.1f}%)")
-        print(f"⚠ Errors:                {errors} ({errors/total*100:.1f}%)")
-        print()
+        print("SUMMARY", file=out)
+        print("-" * 80, file=out)
+        print(f"Total taxa checked:      {total}", file=out)
+        print(f"✓ Matching IDs:          {matches} ({matches/total*100:.1f}%)", file=out)
+        print(f"✗ Mismatched IDs:        {mismatches} ({mismatches/total*100:.1f}%)", file=out)
+        print(f"? Missing/Invalid IDs:   {missing} ({missing/total*100:.1f}%)", file=out)
+        print(f"⚠ Errors:                {errors} ({errors/total*100:.1f}%)", file=out)
+        print(file=out)
 
         # Matching IDs
         if self.results['matches']:
-            print("=" * 80)
-            print(f"MATCHING IDs ({len(self.results['matches'])} taxa)")
-            print("=" * 80)
-            print()
-
-            # Group by file
-            by_file = defaultdict(list)
-            for item in self.results['matches']:
-                by_file[item['source_file']].append(item)
-
-            for filename in sorted(by_file.keys()):
-                print(f"File: {filename}")
-                for item in by_file[filename]:
-                    print(f"  ✓ {item['preferred_term']} → {item['taxon_id']}")
-                print()
+            print("=" * 80, file=out)
+            print(f"MATCHING IDs ({len(self.results['matches'])} taxa)", file=out)
+            print("=" * 80, file=out)
+            print(file=out)
+
+            # Group by file (stable sort keeps per-file order)
+            by_file = sorted(self.results['matches'], key=itemgetter('source_file'))
+
+            for filename, items in groupby(by_file, key=itemgetter('source_file')):
+                print(f"File: {filename}", file=out)
+                for item in items:
+                    print(f"  ✓ {item['preferred_term']} → {item['taxon_id']}", file=out)
+                print(file=out)
 
         # Mismatched IDs
         if self.results['mismatches']:
-            print("=" * 80)
-            print(f"MISMATCHED IDs ({len(self.results['mismatches'])} taxa)")
-            print("=" * 80)
-            print()
+            print("=" * 80, file=out)
+            print(f"MISMATCHED IDs ({len(self.results['mismatches'])} taxa)", file=out)
+            print("=" * 80, file=out)
+            print(file=out)
 
             for item in self.results['mismatches']:
-                print(f"✗ {item['preferred_term']} → {item['taxon_id']}")
-                print(f"  File: {item['source_file']}")
-                print(f"  Expected: '{item['preferred_term']}'")
-                print(f"  OAK says ID points to: '{item['oak_label']}'")
+                print(f"✗ {item['preferred_term']} → {item['taxon_id']}", file=out)
+                print(f"  File: {item['source_file']}", file=out)
+                print(f"  Expected: '{item['preferred_term']}'", file=out)
+                print(f"  OAK says ID points to: '{item['oak_label']}'", file=out)
 
                 if item['suggested_id']:
-                    suggested_label = self.adapter.label(item['suggested_id'])
-                    print(f"  💡 Suggestion: Use {item['suggested_id']} for '{suggested_label}'")
+                    print(
+                        f"  💡 Suggestion: Use {item['suggested_id']} "
+                        f"for '{item['suggested_label']}'",
+                        file=out,
+                    )
+                elif item['homonyms']:
+                    print(
+                        f"  💡 Suggestion: '{item['preferred_term']}' names several taxa:",
+                        file=out,
+                    )
+                    print(
+                        f"     {', '.join(item['homonyms'])}; manual verification needed!",
+                        file=out,
+                    )
                 else:
-                    print(f"  💡 Suggestion: Could not find correct ID for '{item['preferred_term']}'")
-                    print(f"     Manual verification needed!")
+                    print(
+                        "  💡 Suggestion: Could not find correct ID "
+                        f"for '{item['preferred_term']}'",
+                        file=out,
+                    )
+                    print(f"     Manual verification needed!", file=out)
 
-                print()
+                print(file=out)
 
         # Missing/Invalid IDs
         if self.results['missing']:
-            print("=" * 80)
-            print(f"MISSING/INVALID IDs ({len(self.results['missing'])} taxa)")
-            print("=" * 80)
-            print()
+            print("=" * 80, file=out)
+            print(f"MISSING/INVALID IDs ({len(self.results['missing'])} taxa)", file=out)
+            print("=" * 80, file=out)
+            print(file=out)
 
             for item in self.results['missing']:
-                print(f"? {item['preferred_term']} → {item['taxon_id']}")
-                print(f"  File: {item['source_file']}")
-                print(f"  Issue: ID not found in NCBITaxon database")
-
-                suggested_id = self.find_correct_id(item['preferred_term'])
-                if suggested_id:
-                    suggested_label = self.adapter.label(suggested_id)
-                    print(f"  💡 Suggestion: Use {suggested_id} for '{suggested_label}'")
+                print(f"? {item['preferred_term']} → {item['taxon_id']}", file=out)
+                print(f"  File: {item['source_file']}", file=out)
+                print(f"  Issue: ID not found in NCBITaxon database", file=out)
+
+                if item['suggested_id']:
+                    print(
+                        f"  💡 Suggestion: Use {item['suggested_id']} "
+                        f"for '{item['suggested_label']}'",
+                        file=out,
+                    )
+                elif item['homonyms']:
+                    print(
+                        f"  💡 Suggestion: '{item['preferred_term']}' names several taxa:",
+                        file=out,
+                    )
+                    print(
+                        f"     {', '.join(item['homonyms'])}; manual verification needed!",
+                        file=out,
+                    )
                 else:
-                    print(f"  💡 Suggestion: Could not find ID for '{item['preferred_term']}'")
-                    print(f"     Species may not exist in NCBITaxon or name is incorrect")
+                    print(
+                        f"  💡 Suggestion: Could not find ID for '{item['preferred_term']}'",
+                        file=out,
+                    )
+                    print(f"     Species may not exist in NCBITaxon or name is incorrect", file=out)
 
-                print()
+                print(file=out)
 
         # Errors
         if self.results['errors']:
-            print("=" * 80)
-            print(f"ERRORS ({len(self.results['errors'])} taxa)")
-            print("=" * 80)
-            print()
+            print("=" * 80, file=out)
+            print(f"ERRORS ({len(self.results['errors'])} taxa)", file=out)
+            print("=" * 80, file=out)
+            print(file=out)
 
             for item in self.results['errors']:
-                print(f"⚠ {item['preferred_term']} → {item['taxon_id']}")
-                print(f"  File: {item['source_file']}")
-                print(f"  Error: {item['error']}")
-                print()
+                print(f"⚠ {item['preferred_term']} → {item['taxon_id']}", file=out)
+                print(f"  File: {item['source_file']}", file=out)
+                print(f"  Error: {item['error']}", file=out)
+                print(file=out)
 
         # Final recommendations
-        print("=" * 80)
-        print("RECOMMENDATIONS")
-        print("=" * 80)
-        print()
+        print("=" * 80, file=out)
+        print("RECOMMENDATIONS", file=out)
+        print("=" * 80, file=out)
+        print(file=out)
 
         if mismatches > 0 or missing > 0:
-            print("Action items:")
-            print()
+            print("Action items:", file=out)
+            print(file=out)
 
             if mismatches > 0:
-                print(f"1. Review {mismatches} mismatched IDs:")
-                print("   - Verify if the preferred_term is correct")
-                print("   - Update the NCBITaxon ID to match the intended species")
-                print("   - Use suggested IDs where provided")
-                print()
+                print(f"1. Review {mismatches} mismatched IDs:", file=out)
+                print("   - Verify if the preferred_term is correct", file=out)
+                print("   - Update the NCBITaxon ID to match the intended species", file=out)
+                print("   - Use suggested IDs where provided", file=out)
+                print(file=out)
 
             if missing > 0:
-                print(f"2. Investigate {missing} missing/invalid IDs:")
-                print("   - Check if species name spelling is correct")
-                print("   - Verify species exists in NCBI Taxonomy")
-                print("   - Consider if species has been renamed/merged")
-                print()
-
-            print("3. Tools for manual verification:")
-            print("   - NCBI Taxonomy Browser: https://www.ncbi.nlm.nih.gov/taxonomy")
-            print("   - OAK CLI: runoak -i sqlite:obo:ncbitaxon search 'species name'")
-            print()
+                print(f"2. Investigate {missing} missing/invalid IDs:", file=out)
+                print("   - Check if species name spelling is correct", file=out)
+                print("   - Verify species exists in NCBI Taxonomy", file=out)
+                print("   - Consider if species has been renamed/merged", file=out)
+                print(file=out)
+
+            print("3. Tools for manual verification:", file=out)
+            print("   - NCBI Taxonomy Browser: https://www.ncbi.nlm.nih.gov/taxonomy", file=out)
+            print("   - OAK CLI: runoak -i sqlite:obo:ncbitaxon search 'species name'", file=out)
+            print(file=out)
         else:
-            print("✓ All NCBITaxon IDs are valid and match their preferred terms!")
-            print("  No action needed.")
-            print()
+            print("✓ All NCBITaxon IDs are valid and match their preferred terms!", file=out)
+            print("  No action needed.", file=out)
+            print(file=out)
 
-        print("=" * 80)
+        print("=" * 80, file=out)
 
-    def save_detailed_report(self, output_file: str):
-        """Save detailed report to a text file"""
-        import io
-        from contextlib import redirect_stdout
+    def save_detailed_report(self, output_file: str, report_text: Optional[str] = None):
+        """Save detailed report to a text file, reusing already formatted text if given"""
+        if report_text is None:
+            buf = io.StringIO()
+            self.generate_report(buf)
+            report_text = buf.getvalue()
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            with redirect_stdout(f):
-                self.generate_report()
+        Path(output_file).write_text(report_text, encoding='utf-8')
 
         print(f"\nDetailed report saved to: {output_file}")
 
@@ -328,12 +478,17 @@ class NCBITaxonValidator:
         self.initialize_adapter()
         self.extract_all_taxa()
         self.validate_all_taxa()
-        self.generate_report()
+
+        # Format the report once, then send it to the screen and the file
+        buf = io.StringIO()
+        self.generate_report(buf)
+        report_text = buf.getvalue()
+        sys.stdout.write(report_text)
 
         if save_report:
             base_dir = self.communities_dir.parent.parent
             report_file = base_dir / "ncbitaxon_validation_report.txt"
-            self.save_detailed_report(str(report_file))
+            self.save_detailed_report(str(report_file), report_text)
 
 
 def main():
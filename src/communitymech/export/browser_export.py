@@ -4,51 +4,126 @@ Browser export for CommunityMech faceted search.
 Generates app/data.js with searchable community data for web interface.
 """
 
+import contextlib
+import functools
+import gzip
+import hashlib
 import json
+import os
+import shutil
 import yaml
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Iterator, Optional, Set, TextIO, Tuple
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Bump when the processed community format changes to invalidate caches;
+# entries are also keyed on this module's source (see _code_fingerprint)
+CACHE_VERSION = "v2"
 
 
 class BrowserExporter:
     """Export community YAMLs to browser-ready JSON."""
 
-    def __init__(self, communities_dir: Path = Path("kb/communities")):
+    def __init__(
+        self,
+        communities_dir: Path = Path("kb/communities"),
+        cache_dir: Optional[Path] = None,
+    ):
+        """
+        Args:
+            communities_dir: Directory containing community YAML files
+            cache_dir: Directory for caching processed communities between
+                runs, keyed on file path, mtime and size (default: no cache)
+        """
         self.communities_dir = communities_dir
+        self.cache_dir = cache_dir
         self.communities: List[Dict[str, Any]] = []
 
-    def export_all(self, output_path: Path = Path("docs/data.js")) -> None:
+    def export_all(
+        self,
+        output_path: Path = Path("docs/data.js"),
+        workers: Optional[int] = None,
+        compress: bool = False,
+    ) -> None:
         """
         Export all community files to browser JSON.
 
         Args:
             output_path: Path to output JavaScript file
+            workers: Number of worker processes for parsing (default: CPU count;
+                1 parses in this process)
+            compress: Also write a gzip-compressed copy (data.js.gz) for
+                servers that serve pre-compressed assets
         """
-        # Collect all community files
-        yaml_files = sorted(self.communities_dir.glob("*.yaml"))
-
-        print(f"\nExporting {len(yaml_files)} communities to browser format...")
-
-        for yaml_file in yaml_files:
-            try:
-                community_data = self._process_community(yaml_file)
+        # Collect all community files; scandir entries carry their stat
+        # results, so empty files can be set aside without opening them
+        with os.scandir(self.communities_dir) as entries:
+            yaml_entries = sorted(
+                (entry for entry in entries if entry.name.endswith(".yaml") and entry.is_file()),
+                key=lambda entry: entry.name,
+            )
+
+        print(f"\nExporting {len(yaml_entries)} communities to browser format...")
+
+        yaml_files = []
+        for entry in yaml_entries:
+            if entry.stat().st_size:
+                yaml_files.append(Path(entry.path))
+            else:
+                print(f"  ✗ {entry.name}: empty file")
+
+        cache_dir = self.cache_dir / CACHE_VERSION if self.cache_dir else None
+        process = functools.partial(_process_community_file, cache_dir=cache_dir)
+
+        workers = min(workers or os.cpu_count() or 1, len(yaml_files))
+        if workers > 1:
+            # YAML parsing is CPU-bound, so spread files across processes;
+            # map() keeps results in file order
+            chunksize = max(1, len(yaml_files) // (4 * workers))
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(process, yaml_files, chunksize=chunksize))
+        else:
+            results = map(process, yaml_files)
+
+        for yaml_file, community_data, error in results:
+            if error is None:
                 self.communities.append(community_data)
                 print(f"  ✓ {yaml_file.name}")
-            except Exception as e:
-                print(f"  ✗ {yaml_file.name}: {e}")
+            else:
+                print(f"  ✗ {yaml_file.name}: {error}")
 
         # Generate facets from aggregated data
         facets = self._generate_facets()
 
         # Write JavaScript file
         self._write_js_file(output_path, facets)
+        if compress:
+            with open(output_path, "rb") as src, gzip.open(
+                output_path.with_name(output_path.name + ".gz"), "wb", compresslevel=6
+            ) as dst:
+                shutil.copyfileobj(src, dst)
 
         print(f"\n✅ Exported {len(self.communities)} communities to {output_path}")
 
     def _process_community(self, yaml_path: Path) -> Dict[str, Any]:
         """Process a single community YAML into browser-friendly format."""
-        with open(yaml_path) as f:
-            data = yaml.safe_load(f)
+        # libyaml decodes UTF-8 itself, so hand it bytes
+        with open(yaml_path, "rb") as f:
+            data = yaml.load(f, Loader=SafeLoader)
+
+        taxa, functional_roles = self._extract_from_taxonomy(data)
+        metabolites, processes, interaction_types = self._extract_from_interactions(data)
 
         # Extract searchable fields
         community = {
@@ -58,11 +133,11 @@ class BrowserExporter:
             "community_origin": data.get("community_origin", ""),
             "community_category": data.get("community_category", ""),
             "environment": self._extract_environment(data),
-            "taxa": self._extract_taxa(data),
-            "metabolites": self._extract_metabolites(data),
-            "biological_processes": self._extract_processes(data),
-            "interaction_types": self._extract_interaction_types(data),
-            "functional_roles": self._extract_functional_roles(data),
+            "taxa": taxa,
+            "metabolites": metabolites,
+            "biological_processes": processes,
+            "interaction_types": interaction_types,
+            "functional_roles": functional_roles,
             "datasets": self._extract_datasets(data),
             "description": data.get("description", ""),
             "source_file": yaml_path.name,
@@ -85,10 +160,14 @@ class BrowserExporter:
             }
         return {}
 
-    def _extract_taxa(self, data: dict) -> List[Dict[str, str]]:
-        """Extract all taxa from taxonomy section."""
+    def _extract_from_taxonomy(self, data: dict) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """Extract taxa and unique functional roles in one pass over taxonomy."""
         taxa = []
+        roles = set()
+
         for taxon_item in data.get("taxonomy", []):
+            functional_roles = taxon_item.get("functional_role", [])
+            roles.update(functional_roles)
             if "taxon_term" in taxon_item:
                 taxon_term = taxon_item["taxon_term"]
                 term = taxon_term.get("term", {})
@@ -96,66 +175,51 @@ class BrowserExporter:
                     "id": term.get("id", ""),
                     "label": term.get("label", ""),
                     "preferred": taxon_term.get("preferred_term", ""),
-                    "roles": taxon_item.get("functional_role", []),
+                    "roles": functional_roles,
                 })
-        return taxa
 
-    def _extract_metabolites(self, data: dict) -> List[Dict[str, str]]:
-        """Extract all metabolites from ecological interactions."""
+        return taxa, sorted(roles)
+
+    def _extract_from_interactions(
+        self, data: dict
+    ) -> Tuple[List[Dict[str, str]], List[Dict[str, str]], List[str]]:
+        """Extract unique metabolites, biological processes and interaction types in one pass."""
         metabolites = []
-        seen = set()
+        processes = []
+        types = set()
+        seen_metabolites = set()
+        seen_processes = set()
 
         for interaction in data.get("ecological_interactions", []):
             for metabolite in interaction.get("metabolites", []):
                 if "term" in metabolite:
                     term = metabolite["term"]
                     term_id = term.get("id", "")
-                    if term_id and term_id not in seen:
+                    if term_id and term_id not in seen_metabolites:
                         metabolites.append({
                             "id": term_id,
                             "label": term.get("label", ""),
                             "preferred": metabolite.get("preferred_term", ""),
                         })
-                        seen.add(term_id)
+                        seen_metabolites.add(term_id)
 
-        return metabolites
-
-    def _extract_processes(self, data: dict) -> List[Dict[str, str]]:
-        """Extract biological processes from ecological interactions."""
-        processes = []
-        seen = set()
-
-        for interaction in data.get("ecological_interactions", []):
             for process in interaction.get("biological_processes", []):
                 if "term" in process:
                     term = process["term"]
                     term_id = term.get("id", "")
-                    if term_id and term_id not in seen:
+                    if term_id and term_id not in seen_processes:
                         processes.append({
                             "id": term_id,
                             "label": term.get("label", ""),
                             "preferred": process.get("preferred_term", ""),
                         })
-                        seen.add(term_id)
+                        seen_processes.add(term_id)
 
-        return processes
-
-    def _extract_interaction_types(self, data: dict) -> List[str]:
-        """Extract unique interaction types."""
-        types = set()
-        for interaction in data.get("ecological_interactions", []):
             itype = interaction.get("interaction_type")
             if itype:
                 types.add(itype)
-        return sorted(types)
 
-    def _extract_functional_roles(self, data: dict) -> List[str]:
-        """Extract unique functional roles from taxonomy."""
-        roles = set()
-        for taxon_item in data.get("taxonomy", []):
-            for role in taxon_item.get("functional_role", []):
-                roles.add(role)
-        return sorted(roles)
+        return metabolites, processes, sorted(types)
 
     def _extract_datasets(self, data: dict) -> List[Dict[str, str]]:
         """Extract associated datasets."""
@@ -172,37 +236,47 @@ class BrowserExporter:
 
     def _build_search_text(self, community: dict) -> str:
         """Build combined search text from all fields."""
-        parts = [
-            community["name"],
-            community["description"],
-            community["ecological_state"],
-            community["environment"].get("label", ""),
-            community["environment"].get("preferred", ""),
-        ]
+        # Joining pre-split words normalizes whitespace in a single pass
+        return " ".join(
+            word
+            for field in self._search_fields(community)
+            if field
+            for word in str(field).split()
+        )
+
+    def _search_fields(self, community: dict) -> Iterator[Any]:
+        """Yield every searchable field value of a processed community."""
+        yield community["name"]
+        yield community["description"]
+        yield community["ecological_state"]
+        yield community["environment"].get("label", "")
+        yield community["environment"].get("preferred", "")
 
         # Add taxa labels
         for taxon in community["taxa"]:
-            parts.extend([taxon["label"], taxon["preferred"]])
+            yield taxon["label"]
+            yield taxon["preferred"]
 
         # Add metabolite labels
         for metabolite in community["metabolites"]:
-            parts.extend([metabolite["label"], metabolite["preferred"]])
+            yield metabolite["label"]
+            yield metabolite["preferred"]
 
         # Add process labels
         for process in community["biological_processes"]:
-            parts.extend([process["label"], process["preferred"]])
+            yield process["label"]
+            yield process["preferred"]
 
         # Add interaction types and roles
-        parts.extend(community["interaction_types"])
-        parts.extend(community["functional_roles"])
+        yield from community["interaction_types"]
+        yield from community["functional_roles"]
 
         # Add dataset names and types
         for ds in community["datasets"]:
-            parts.extend([ds["name"], ds["dataset_type"], ds["repository"], ds["accession"]])
-
-        # Combine and clean
-        text = " ".join(str(p) for p in parts if p)
-        return " ".join(text.split())  # Normalize whitespace
+            yield ds["name"]
+            yield ds["dataset_type"]
+            yield ds["repository"]
+            yield ds["accession"]
 
     def _generate_facets(self) -> Dict[str, Any]:
         """Generate facet data from all communities."""
@@ -210,8 +284,8 @@ class BrowserExporter:
         community_origins: Set[str] = set()
         community_categories: Set[str] = set()
         environments: Set[str] = set()
-        taxa: Set[str] = set()
-        metabolites: Set[str] = set()
+        taxa: Counter = Counter()
+        metabolites: Counter = Counter()
         interaction_types: Set[str] = set()
         functional_roles: Set[str] = set()
         dataset_types: Set[str] = set()
@@ -230,13 +304,15 @@ class BrowserExporter:
             if community["environment"].get("label"):
                 environments.add(community["environment"]["label"])
 
-            for taxon in community["taxa"]:
-                if taxon["label"]:
-                    taxa.add(taxon["label"])
-
-            for metabolite in community["metabolites"]:
-                if metabolite["label"]:
-                    metabolites.add(metabolite["label"])
+            # Count communities per label (not occurrences) for ranking
+            taxa.update({taxon["label"] for taxon in community["taxa"] if taxon["label"]})
+            metabolites.update(
+                {
+                    metabolite["label"]
+                    for metabolite in community["metabolites"]
+                    if metabolite["label"]
+                }
+            )
 
             interaction_types.update(community["interaction_types"])
             functional_roles.update(community["functional_roles"])
@@ -252,8 +328,8 @@ class BrowserExporter:
             "community_origins": sorted(community_origins),
             "community_categories": sorted(community_categories),
             "environments": sorted(environments),
-            "taxa": sorted(taxa)[:50],  # Limit to top 50 most common
-            "metabolites": sorted(metabolites)[:50],
+            "taxa": _most_common(taxa, 50),  # Limit to top 50 most common
+            "metabolites": _most_common(metabolites, 50),
             "interaction_types": sorted(interaction_types),
             "functional_roles": sorted(functional_roles),
             "dataset_types": sorted(dataset_types),
@@ -264,21 +340,98 @@ class BrowserExporter:
         """Write JavaScript file with data and facets."""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, "w") as f:
+        with open(output_path, "w", encoding="utf-8") as f:
             f.write("// CommunityMech Browser Data\n")
             f.write("// Auto-generated by src/communitymech/export/browser_export.py\n\n")
 
-            # Write search data
-            f.write("window.communityData = ")
-            f.write(json.dumps(self.communities, indent=2))
-            f.write(";\n\n")
+            # Write search data, one statement per community so the browser
+            # parses and can collect each record independently
+            f.write("window.communityData = [];\n")
+            for community in self.communities:
+                f.write("window.communityData.push(")
+                _dump_json(community, f)
+                f.write(");\n")
+            f.write("\n")
 
             # Write facets
             f.write("window.facets = ")
-            f.write(json.dumps(facets, indent=2))
+            _dump_json(facets, f)
             f.write(";\n")
 
 
+def _most_common(counts: Counter, n: int) -> List[str]:
+    """Return the n most frequent labels, ties broken alphabetically."""
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return [label for label, _ in ranked[:n]]
+
+
+def _dump_json(obj: Any, f: TextIO) -> None:
+    """Serialize obj as compact JSON straight into an open text file."""
+    if orjson is not None:
+        # orjson emits UTF-8 bytes; flush pending text before writing underneath
+        f.flush()
+        f.buffer.write(orjson.dumps(obj))
+    else:
+        json.dump(obj, f, separators=(",", ":"))
+
+
+def _process_community_file(
+    yaml_path: Path, cache_dir: Optional[Path] = None
+) -> Tuple[Path, Optional[Dict[str, Any]], Optional[str]]:
+    """Process one community file, returning its data or the error message."""
+    if cache_dir is None:
+        try:
+            return yaml_path, BrowserExporter()._process_community(yaml_path), None
+        except Exception as e:
+            return yaml_path, None, str(e)
+
+    try:
+        stat = yaml_path.stat()
+    except OSError as e:
+        return yaml_path, None, str(e)
+    key = (str(yaml_path.resolve()), stat.st_mtime_ns, stat.st_size, _code_fingerprint())
+    path_hash = hashlib.sha1(key[0].encode(), usedforsecurity=False).hexdigest()
+    cache_file = cache_dir / f"{path_hash}.json"
+
+    # Check cache first; an unreadable, corrupt or stale entry is a miss
+    try:
+        with open(cache_file, "rb") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        entry = None
+    if (
+        isinstance(entry, dict)
+        and entry.get("key") == list(key)
+        and isinstance(entry.get("community"), dict)
+    ):
+        return yaml_path, entry["community"], None
+
+    try:
+        community = BrowserExporter()._process_community(yaml_path)
+    except Exception as e:
+        return yaml_path, None, str(e)
+
+    # Cache the result; write to a temporary file so readers never see a partial entry.
+    # The cache is an optimization, so an unwritable cache directory is not an error
+    tmp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump({"key": key, "community": community}, f, ensure_ascii=False)
+        os.replace(tmp_file, cache_file)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp_file.unlink()
+
+    return yaml_path, community, None
+
+
+@functools.lru_cache(maxsize=None)
+def _code_fingerprint() -> str:
+    """Hash this module's source, so cached entries expire when the processing code changes."""
+    return hashlib.sha1(Path(__file__).read_bytes(), usedforsecurity=False).hexdigest()
+
+
 def main():
     """CLI for browser export."""
     import sys
@@ -295,11 +448,35 @@ def main():
         default="docs/data.js",
         help="Output JavaScript file path",
     )
+    parser.add_argument(
+        "--cache-dir",
+        default=".cache/browser_export",
+        help="Directory for caching parsed communities between runs",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Parse every community file, ignoring the cache",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="Also write a gzip-compressed copy of the output",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for parsing (default: CPU count)",
+    )
 
     args = parser.parse_args()
 
-    exporter = BrowserExporter(communities_dir=Path(args.communities_dir))
-    exporter.export_all(output_path=Path(args.output))
+    exporter = BrowserExporter(
+        communities_dir=Path(args.communities_dir),
+        cache_dir=None if args.no_cache else Path(args.cache_dir),
+    )
+    exporter.export_all(output_path=Path(args.output), workers=args.workers, compress=args.gzip)
 
 
 if __name__ == "__main__":
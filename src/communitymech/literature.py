@@ -4,23 +4,87 @@ Literature fetching utilities for CommunityMech.
 Fetches papers from PubMed, DOI, and other sources with caching.
 """
 
+import functools
 import re
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Any, Dict, Iterable, Optional, Tuple
 import time
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from rapidfuzz import fuzz
+
+# E-utilities accepts up to 200 IDs per efetch request
+PUBMED_BATCH_SIZE = 200
+
+# Runs of whitespace collapsed to one space when comparing snippets
+WHITESPACE_RUN = re.compile(r"\s+")
+
+# Trailer line ending each record of a multi-record text efetch response
+PUBMED_PMID_LINE = re.compile(r"^PMID: *(\d+).*$", re.MULTILINE)
+
+
+def create_session(pool_size: int = 32) -> requests.Session:
+    """
+    Create an HTTP session with keep-alive connection pooling and retries.
+
+    A single session can be shared by several fetchers so that repeated
+    requests to the same hosts reuse open TCP/TLS connections.
+
+    Args:
+        pool_size: Maximum number of pooled connections per host
+
+    Returns:
+        Configured requests session
+    """
+    session = requests.Session()
+    session.headers.update({
+        "User-Agent": "CommunityMech/0.1.0 (https://github.com/CultureBotAI/CommunityMech)"
+    })
+
+    # POST is only used for batched efetch lookups, which are idempotent reads,
+    # so it is retried along with urllib3's default safe methods
+    retry = Retry(
+        total=3,
+        backoff_factor=0.3,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS | {"POST"},
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+
+    return session
+
+
+def _normalize_text(text: str) -> str:
+    """Collapse whitespace and lowercase text for snippet matching."""
+    return WHITESPACE_RUN.sub(" ", text).strip().lower()
+
+
+# Several snippets are usually validated against the same abstract in a row
+_prepare_abstract = functools.lru_cache(maxsize=64)(_normalize_text)
 
 
 class LiteratureFetcher:
     """Fetch and cache scientific literature."""
 
-    def __init__(self, cache_dir: str = "references_cache"):
+    def __init__(
+        self,
+        cache_dir: str = "references_cache",
+        session: Optional[requests.Session] = None,
+    ):
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "CommunityMech/0.1.0 (https://github.com/CultureBotAI/CommunityMech)"
-        })
+        self.session = session if session is not None else create_session()
+        # In-process copy of cache entries read or written during this run,
+        # keyed by cache file name; the same paper is often cited many times
+        self._memory_cache: Dict[str, Any] = {}
+
+    def clear_memory_cache(self) -> None:
+        """Drop in-process cache entries so the next lookups re-read disk."""
+        self._memory_cache.clear()
 
     def fetch_pubmed_abstract(self, pmid: str) -> Optional[str]:
         """
@@ -37,8 +101,12 @@ class LiteratureFetcher:
 
         # Check cache first
         cache_file = self.cache_dir / f"pmid_{pmid}.txt"
+        abstract = self._memory_cache.get(cache_file.name)
+        if abstract is not None:
+            return abstract
         if cache_file.exists():
-            return cache_file.read_text()
+            abstract = self._memory_cache[cache_file.name] = cache_file.read_text()
+            return abstract
 
         # Fetch from PubMed E-utilities
         url = f"https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
@@ -57,6 +125,7 @@ class LiteratureFetcher:
 
             # Cache the result
             cache_file.write_text(abstract)
+            self._memory_cache[cache_file.name] = abstract
 
             return abstract
 
@@ -64,6 +133,79 @@ class LiteratureFetcher:
             print(f"Error fetching PMID {pmid}: {e}")
             return None
 
+    def fetch_pubmed_abstracts(self, pmids: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Fetch abstracts for several PMIDs, batching uncached ones into
+        efetch requests of up to PUBMED_BATCH_SIZE IDs.
+
+        Args:
+            pmids: PubMed IDs, with or without the "PMID:" prefix
+
+        Returns:
+            Dict mapping each cleaned PMID to its abstract text, or None if
+            PubMed returned no record for it
+        """
+        abstracts: Dict[str, Optional[str]] = {}
+        missing = []
+
+        # Check cache first
+        for pmid in pmids:
+            pmid = pmid.replace("PMID:", "").strip()
+            if pmid in abstracts:
+                continue
+            cache_file = self.cache_dir / f"pmid_{pmid}.txt"
+            abstract = self._memory_cache.get(cache_file.name)
+            if abstract is None and cache_file.exists():
+                abstract = self._memory_cache[cache_file.name] = cache_file.read_text()
+            if abstract is not None:
+                abstracts[pmid] = abstract
+            else:
+                abstracts[pmid] = None
+                missing.append(pmid)
+
+        url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+
+        for start in range(0, len(missing), PUBMED_BATCH_SIZE):
+            batch = missing[start:start + PUBMED_BATCH_SIZE]
+            if start:
+                # Stay under NCBI's 3 requests/second limit without an API key
+                time.sleep(0.34)
+
+            data = {
+                "db": "pubmed",
+                "id": ",".join(batch),
+                "rettype": "abstract",
+                "retmode": "text",
+            }
+
+            try:
+                # POST keeps long ID lists out of the URL
+                response = self.session.post(url, data=data, timeout=60)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f"Error fetching {len(batch)} PMIDs: {e}")
+                continue
+
+            # Each record ends with its "PMID: <id>" line
+            record_start = 0
+            for match in PUBMED_PMID_LINE.finditer(response.text):
+                record = response.text[record_start:match.end()].strip()
+                record_start = match.end()
+                pmid = match.group(1)
+                if pmid not in abstracts:
+                    continue
+
+                # Number the record as a single-PMID fetch would
+                abstract = re.sub(r"^\d+\.", "1.", record, count=1) + "\n"
+                abstracts[pmid] = abstract
+
+                # Cache the result
+                cache_file = self.cache_dir / f"pmid_{pmid}.txt"
+                cache_file.write_text(abstract)
+                self._memory_cache[cache_file.name] = abstract
+
+        return abstracts
+
     def fetch_doi_metadata(self, doi: str) -> Optional[dict]:
         """
         Fetch metadata for a DOI from CrossRef.
@@ -77,11 +219,16 @@ class LiteratureFetcher:
         # Clean DOI
         doi = doi.replace("doi:", "").replace("https://doi.org/", "").strip()
 
-        # Check cache
+        # Check cache; callers get their own top-level dict, so adding or
+        # replacing keys does not change what later callers see
         cache_file = self.cache_dir / f"doi_{doi.replace('/', '_')}.json"
+        metadata = self._memory_cache.get(cache_file.name)
+        if metadata is not None:
+            return dict(metadata)
         if cache_file.exists():
             import json
-            return json.loads(cache_file.read_text())
+            metadata = self._memory_cache[cache_file.name] = json.loads(cache_file.read_text())
+            return dict(metadata)
 
         # Fetch from CrossRef
         url = f"https://api.crossref.org/works/{doi}"
@@ -95,8 +242,9 @@ class LiteratureFetcher:
             # Cache the result
             import json
             cache_file.write_text(json.dumps(metadata, indent=2))
+            self._memory_cache[cache_file.name] = metadata
 
-            return metadata
+            return dict(metadata)
 
         except requests.exceptions.RequestException as e:
             print(f"Error fetching DOI {doi}: {e}")
@@ -115,6 +263,12 @@ class LiteratureFetcher:
         """
         doi = doi.replace("doi:", "").replace("https://doi.org/", "").strip()
 
+        # Answers are not cached on disk, but are kept for this run; None is a
+        # valid answer, so check membership rather than the value
+        memory_key = f"unpaywall_{doi}"
+        if memory_key in self._memory_cache:
+            return self._memory_cache[memory_key]
+
         url = f"https://api.unpaywall.org/v2/{doi}"
         params = {"email": email}
 
@@ -125,11 +279,12 @@ class LiteratureFetcher:
             data = response.json()
 
             # Check for OA location
+            pdf_url = None
             if data.get("is_oa") and data.get("best_oa_location"):
                 pdf_url = data["best_oa_location"].get("url_for_pdf")
-                return pdf_url
 
-            return None
+            self._memory_cache[memory_key] = pdf_url
+            return pdf_url
 
         except requests.exceptions.RequestException as e:
             print(f"Error checking Unpaywall for {doi}: {e}")
@@ -171,6 +326,43 @@ class LiteratureFetcher:
             print(f"Unknown reference format: {reference}")
             return (None, None)
 
+    def fetch_papers(
+        self,
+        references: Iterable[str],
+        email: str = "noreply@example.com",
+        max_workers: int = 5,
+    ) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Fetch several papers concurrently.
+
+        PMIDs are first fetched in batches; other requests share this
+        fetcher's pooled session, so concurrent fetches reuse open
+        connections. Cached references return without a request.
+        Keep max_workers low to respect NCBI/CrossRef rate limits: the
+        default session retries 429 and 5xx responses with backoff,
+        honouring Retry-After, but a session passed to the constructor
+        keeps its own retry policy.
+
+        Args:
+            references: PMIDs and/or DOIs, as accepted by ``fetch_paper``
+            email: Email for APIs
+            max_workers: Maximum number of concurrent fetches
+
+        Returns:
+            Dict mapping each distinct reference to (abstract_text, pdf_url)
+        """
+        # Deduplicate so no two workers fetch (and cache) the same reference
+        unique = list(dict.fromkeys(references))
+
+        # Warm the cache with batched efetch requests for the PMIDs
+        self.fetch_pubmed_abstracts(
+            ref for ref in unique if ref.startswith("PMID:") or ref.isdigit()
+        )
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda ref: self.fetch_paper(ref, email=email), unique)
+            return dict(zip(unique, results))
+
     def validate_evidence_snippet(self, snippet: str, abstract: str) -> bool:
         """
         Check if a snippet appears in the abstract (fuzzy match).
@@ -185,21 +377,18 @@ class LiteratureFetcher:
         if not abstract or not snippet:
             return False
 
-        # Normalize whitespace
-        snippet_normalized = " ".join(snippet.split())
-        abstract_normalized = " ".join(abstract.split())
+        # Normalize whitespace and case; the abstract is prepared once and
+        # reused while its snippets are checked
+        snippet_lower = _normalize_text(snippet)
+        abstract_lower = _prepare_abstract(abstract)
 
         # Check for exact match
-        if snippet_normalized.lower() in abstract_normalized.lower():
-            return True
-
-        # Check for fuzzy match (allow minor differences)
-        from difflib import SequenceMatcher
-        ratio = SequenceMatcher(None, snippet_normalized.lower(), abstract_normalized.lower()).ratio()
-        if ratio > 0.95:
+        if snippet_lower in abstract_lower:
             return True
 
-        return False
+        # Check for fuzzy match (allow minor differences) against the
+        # best-aligned passage of the abstract, not the whole abstract
+        return fuzz.partial_ratio(snippet_lower, abstract_lower, score_cutoff=95) > 95
 
 
 def main():
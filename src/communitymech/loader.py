@@ -0,0 +1,554 @@
+"""
+Fast construction of CommunityMech datamodel objects.
+
+The classes in ``communitymech.datamodel.communitymech`` are generated by
+``just gen-python`` and coerce every slot in ``__post_init__`` through a chain
+of ``_is_empty``/``isinstance``/``str()`` calls. This module inspects the
+generated dataclasses once and compiles a straight-line builder per class that
+builds instances from plain YAML/JSON data. Scalar, enum and nested object
+slots are coerced as ``__post_init__`` would coerce them; inlined multivalued
+slots differ, as described below.
+
+The builders, and the generated datamodel with its linkml_runtime/rdflib
+imports, are only loaded on first use, so importing this module is cheap.
+
+Multivalued class slots (``evidence``, ``metabolites``, ``downstream``, ...) are
+kept as lists in document order, as declared in the schema. The generated
+constructors instead re-key them into dicts by their first slot, which loses
+entries that share a key and raises for ``taxonomy``, whose first slot is
+itself an object; most knowledge base files cannot be built that way at all.
+
+Run ``python -m communitymech.loader`` to check that every community file
+builds into the datamodel.
+"""
+
+import dataclasses
+import functools
+import sys
+import typing
+import weakref
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypedDict,
+)
+
+import yaml
+from jsonasobj2 import as_dict
+
+if TYPE_CHECKING:
+    from linkml_runtime.utils.enumerations import EnumDefinitionImpl
+    from linkml_runtime.utils.yamlutils import YAMLRoot
+
+    from communitymech.datamodel import communitymech as model
+
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+# Short, heavily repeated identifier slots whose values are interned so equal
+# strings share one object. Entries are slot names or "Class.slot".
+INTERNED_SLOTS = frozenset({
+    "id",
+    "label",
+    "preferred_term",
+    "reference",
+    "target",
+    "EcologicalInteraction.name",
+})
+
+
+def _model_classes(model: Any) -> List[Type["YAMLRoot"]]:
+    """Return the generated dataclasses in definition order."""
+    return [
+        obj
+        for obj in vars(model).values()
+        if isinstance(obj, type)
+        and dataclasses.is_dataclass(obj)
+        and obj.__module__ == model.__name__
+    ]
+
+
+def _slot_spec(hint: Any) -> Tuple[str, Any, bool, bool]:
+    """
+    Classify a generated slot annotation.
+
+    Args:
+        hint: Resolved type annotation of a dataclass field
+
+    Returns:
+        Tuple of (kind, range class, required, multivalued), where kind is one of
+        "str", "float", "bool", "enum" or "object"
+    """
+    from linkml_runtime.utils.enumerations import EnumDefinitionImpl
+    from linkml_runtime.utils.metamodelcore import Bool
+    from linkml_runtime.utils.yamlutils import YAMLRoot
+
+    ranges = []
+    required = True
+    multivalued = False
+    stack = [hint]
+    while stack:
+        t = stack.pop()
+        origin = typing.get_origin(t)
+        if origin is typing.Union:
+            stack.extend(typing.get_args(t))
+        elif origin is list:
+            multivalued = True
+            stack.extend(typing.get_args(t))
+        elif t is type(None):
+            required = False
+        else:
+            ranges.append(t)
+
+    for t in ranges:
+        if isinstance(t, type) and issubclass(t, EnumDefinitionImpl):
+            return "enum", t, required, multivalued
+    for t in ranges:
+        if isinstance(t, type) and issubclass(t, YAMLRoot):
+            return "object", t, required, multivalued
+    if Bool in ranges:
+        return "bool", Bool, required, multivalued
+    if float in ranges:
+        return "float", float, required, multivalued
+    return "str", str, required, multivalued
+
+
+def _coerce_lines(
+    name: str, kind: str, rng: Any, required: bool, multivalued: bool, intern: bool = False
+) -> List[str]:
+    """Emit source lines that coerce ``data[name]`` and store it on ``self``."""
+    cname = rng.__name__
+    lines = [f"    v = data.get({name!r})"]
+
+    if multivalued and kind == "enum":
+        # map() over the table's __getitem__ keeps the loop in C; members of
+        # the enum hash and compare by text, so they map to themselves. A miss
+        # falls back to the per-item path, which raises for unknown codes.
+        lines += [
+            "    if v is None:",
+            f"        self.{name} = []",
+            "    else:",
+            "        if type(v) is not list:",
+            "            v = [v]",
+            "        try:",
+            f"            self.{name} = list(map(_LOOKUP_{cname}, v))",
+            "        except (KeyError, TypeError):",
+            f"            E = {cname}",
+            f"            get = _GET_{cname}",
+            f"            self.{name} = [x if type(x) is E else (get(x) or E(x)) for x in v]",
+        ]
+        return lines
+
+    if multivalued and kind == "object":
+        lines.append(f"    self.{name} = _norm_list(v, {cname}, build_{cname})")
+        return lines
+
+    if multivalued:
+        lines += [
+            "    if v is None:",
+            "        v = []",
+            "    elif type(v) is not list:",
+            "        v = [v]",
+        ]
+        lines.append(f"    self.{name} = list(map({cname}, v))")
+        return lines
+
+    if required:
+        empty = "v is None or v == ''" if kind == "str" else "v is None"
+        lines += [f"    if {empty}:", f"        _missing({name!r})"]
+        guard = ""
+    else:
+        guard = "v is not None and "
+
+    if kind == "str" and intern:
+        if required:
+            lines.append("    v = _intern(v if type(v) is str else str(v))")
+        else:
+            lines += [
+                "    if v is not None:",
+                "        v = _intern(v if type(v) is str else str(v))",
+            ]
+    elif kind == "object":
+        build_fn = "_term" if cname == "Term" else f"build_{cname}"
+        lines += [
+            f"    if {guard}type(v) is not {cname}:",
+            f"        v = {build_fn}(v if type(v) is dict else as_dict(v))",
+        ]
+    elif kind == "enum":
+        lines += [
+            f"    if {guard}type(v) is not {cname}:",
+            f"        v = _GET_{cname}(v) or {cname}(v)",
+        ]
+    elif kind == "bool":
+        if not required:
+            lines.append("    if v is not None:")
+            lines.append("        v = Bool(v)")
+        else:
+            lines.append("    v = Bool(v)")
+    else:
+        lines += [
+            f"    if {guard}type(v) is not {cname}:",
+            f"        v = {cname}(v)",
+        ]
+    lines.append(f"    self.{name} = v")
+    return lines
+
+
+def _builder_source(cls: Type["YAMLRoot"]) -> str:
+    """Generate the source of ``build_<cls>(data)`` for one datamodel class."""
+    hints = typing.get_type_hints(cls)
+    cname = cls.__name__
+    lines = [
+        f"def build_{cname}(data):",
+        f"    if not data.keys() <= _FIELDS_{cname}:",
+        f"        _unknown({cname}, data)",
+        f"    self = _new({cname})",
+    ]
+    for field in dataclasses.fields(cls):
+        intern = field.name in INTERNED_SLOTS or f"{cname}.{field.name}" in INTERNED_SLOTS
+        lines += _coerce_lines(field.name, *_slot_spec(hints[field.name]), intern=intern)
+    lines.append("    return self")
+    return "\n".join(lines) + "\n"
+
+
+def _enum_table(enum_cls: Type["EnumDefinitionImpl"]) -> Dict[str, "EnumDefinitionImpl"]:
+    """
+    Map each permissible value text of an enum to its promoted class member.
+
+    Lookups in this table replace ``EnumDefinitionImpl.__init__``; values that
+    are not in the table still go through the enum constructor, which raises
+    the usual ValueError for unknown codes.
+    """
+    return {
+        member.text: member
+        for member in vars(enum_cls).values()
+        if isinstance(member, enum_cls)
+    }
+
+
+def _missing(field_name: str) -> None:
+    raise ValueError(f"{field_name} must be supplied")
+
+
+def _unknown(cls: Type["YAMLRoot"], data: dict) -> None:
+    extra = sorted(set(data) - {f.name for f in dataclasses.fields(cls)})
+    raise ValueError(f"Unknown arguments for {cls.__name__}: {', '.join(extra)}")
+
+
+class TermDict(TypedDict):
+    """Term payload as parsed from community YAML or JSON."""
+
+    id: str
+    label: str
+
+
+# Hash-consed ontology terms, keyed on (id, label). The same CHEBI/GO/ENVO/NCBITaxon
+# term recurs across descriptors, so identical terms share one instance.
+_TERMS: "weakref.WeakValueDictionary[Tuple[str, str], model.Term]" = weakref.WeakValueDictionary()
+
+# Compiled Term builder and read-only Term subclass, bound by _compile_builders()
+_build_term: Optional[Callable[[dict], "model.Term"]] = None
+_SharedTerm: Optional[Type["model.Term"]] = None
+
+
+def _shared_term_class(term_cls: Type["model.Term"]) -> Type["model.Term"]:
+    """
+    Create the read-only ``Term`` subclass used for hash-consed terms.
+
+    A shared term is referenced by every descriptor that names it, so
+    assigning to one would silently change them all; its slots are
+    read-only instead. It compares equal to a plain ``Term`` with the same
+    slot values.
+    """
+
+    class SharedTerm(term_cls):
+        __slots__ = ()
+
+        def __setattr__(self, name: str, value: Any) -> None:
+            raise AttributeError(
+                f"Shared Term {self.id} is read-only; build a new Term to change it"
+            )
+
+        def __delattr__(self, name: str) -> None:
+            raise AttributeError(
+                f"Shared Term {self.id} is read-only; build a new Term to change it"
+            )
+
+        def __eq__(self, other: object) -> bool:
+            if isinstance(other, term_cls):
+                return self.__dict__ == other.__dict__
+            return NotImplemented
+
+        __hash__ = None
+
+    # Resolvable as communitymech.loader.SharedTerm, so instances pickle
+    SharedTerm.__module__ = __name__
+    SharedTerm.__qualname__ = "SharedTerm"
+    return SharedTerm
+
+
+def _term(data: TermDict) -> "model.Term":
+    """Return the shared ``Term`` for a term mapping, building it on first use."""
+    key = (data.get("id"), data.get("label"))
+    term = _TERMS.get(key)
+    if term is None or len(data) != 2:
+        built = _build_term(data)
+        term = object.__new__(_SharedTerm)
+        term.__dict__.update(built.__dict__)
+        _TERMS[(term.id, term.label)] = term
+    return term
+
+
+def get_term(term_id: str, label: str) -> "model.Term":
+    """
+    Return the shared ``Term`` instance for an ontology term.
+
+    Terms are hash-consed, so the returned object is read-only; assigning
+    to its slots raises AttributeError.
+
+    Args:
+        term_id: Term CURIE (e.g., "CHEBI:17992")
+        label: Term label
+
+    Returns:
+        Term instance shared by every descriptor with the same id and label
+    """
+    _compile_builders()
+    return _term({"id": term_id, "label": label})
+
+
+def _norm_list(value: Any, cls: Type["YAMLRoot"], build: Callable[[dict], "YAMLRoot"]) -> list:
+    """
+    Normalize an inlined multivalued class slot to a list of ``cls`` instances.
+
+    Args:
+        value: None, a single item, or a list of items
+        cls: Range class of the slot
+        build: Compiled builder for ``cls``
+
+    Returns:
+        List of ``cls`` instances in input order
+    """
+    if value is None:
+        return []
+    if type(value) is not list:
+        value = [value]
+    return [
+        x if type(x) is cls else build(x if type(x) is dict else as_dict(x))
+        for x in value
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_builders() -> Dict[Type["YAMLRoot"], Callable[[dict], "YAMLRoot"]]:
+    """Import the generated datamodel and compile one builder per class."""
+    global _build_term, _SharedTerm
+
+    from linkml_runtime.utils.enumerations import EnumDefinitionImpl
+    from linkml_runtime.utils.metamodelcore import Bool
+    from linkml_runtime.utils.yamlutils import YAMLRoot
+
+    from communitymech.datamodel import communitymech as model
+
+    namespace: Dict[str, Any] = {
+        "as_dict": as_dict,
+        "Bool": Bool,
+        "_intern": sys.intern,
+        "_new": object.__new__,
+        "_norm_list": _norm_list,
+        "_term": _term,
+        "_missing": _missing,
+        "_unknown": _unknown,
+    }
+    namespace.update(
+        (name, obj)
+        for name, obj in vars(model).items()
+        if isinstance(obj, type) and issubclass(obj, YAMLRoot)
+    )
+
+    for name, obj in vars(model).items():
+        if isinstance(obj, type) and issubclass(obj, EnumDefinitionImpl) and obj._defn is not None:
+            table = _enum_table(obj)
+            namespace[f"_GET_{name}"] = table.get
+            namespace[f"_LOOKUP_{name}"] = table.__getitem__
+
+    classes = _model_classes(model)
+    for cls in classes:
+        namespace[f"_FIELDS_{cls.__name__}"] = frozenset(f.name for f in dataclasses.fields(cls))
+        source = _builder_source(cls)
+        code = compile(source, f"<communitymech.loader build_{cls.__name__}>", "exec")
+        exec(code, namespace)  # noqa: S102 - source generated from datamodel fields
+
+    _build_term = namespace["build_Term"]
+    _SharedTerm = _shared_term_class(model.Term)
+    return {cls: namespace[f"build_{cls.__name__}"] for cls in classes}
+
+
+def __getattr__(name: str) -> Any:
+    if name == "BUILDERS":
+        return _compile_builders()
+    if name == "SharedTerm":
+        _compile_builders()
+        return _SharedTerm
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def build(cls: Type["YAMLRoot"], data: dict) -> "YAMLRoot":
+    """
+    Build a datamodel object from a plain mapping.
+
+    Args:
+        cls: Generated datamodel class (e.g. ``EvidenceItem``)
+        data: Mapping of slot names to values, as parsed from YAML or JSON
+
+    Returns:
+        Instance of ``cls``. Scalar, enum and object slots are coerced as the
+        generated ``__post_init__`` would; inlined multivalued slots are
+        lists rather than the generated keyed dicts
+
+    Raises:
+        ValueError: If a required slot is missing, an unknown slot is present,
+            or an enum value is not permissible
+    """
+    return _compile_builders()[cls](data)
+
+
+def build_many(cls: Type["YAMLRoot"], records: Iterable[dict]) -> List["YAMLRoot"]:
+    """
+    Build a list of datamodel objects from plain mappings.
+
+    The builder for ``cls`` is looked up once and mapped over the records,
+    so large batches (e.g. evidence items gathered across communities) pay
+    no per-item dispatch.
+
+    Args:
+        cls: Generated datamodel class
+        records: Mappings of slot names to values
+
+    Returns:
+        List of ``cls`` instances, in input order
+
+    Raises:
+        ValueError: As for ``build``
+    """
+    return list(map(_compile_builders()[cls], records))
+
+
+@functools.lru_cache(maxsize=None)
+def _field_defaults(cls: Type["YAMLRoot"]) -> Tuple[Tuple[str, Any, Any], ...]:
+    """Return (name, default_factory, default) for each field of a dataclass."""
+    return tuple(
+        (f.name, None if f.default_factory is dataclasses.MISSING else f.default_factory, f.default)
+        for f in dataclasses.fields(cls)
+    )
+
+
+def construct(cls: Type["YAMLRoot"], **fields: Any) -> "YAMLRoot":
+    """
+    Build a datamodel object from trusted, already-coerced slot values.
+
+    No required-slot checks or type coercion are performed, in the manner of
+    Pydantic's ``model_construct``. Absent slots get the generated defaults.
+    Use ``build`` for data read from files.
+
+    Args:
+        cls: Generated datamodel class
+        **fields: Slot values of the declared types
+
+    Returns:
+        Instance of ``cls``
+
+    Raises:
+        TypeError: If a keyword is not a slot of ``cls``
+    """
+    obj = object.__new__(cls)
+    for name, factory, default in _field_defaults(cls):
+        value = fields.pop(name, dataclasses.MISSING)
+        if value is dataclasses.MISSING:
+            value = factory() if factory is not None else default
+        setattr(obj, name, value)
+    if fields:
+        raise TypeError(f"Unknown arguments for {cls.__name__}: {', '.join(sorted(fields))}")
+    return obj
+
+
+def load_community(data: dict) -> "model.MicrobialCommunity":
+    """
+    Build a ``MicrobialCommunity`` from a parsed community YAML document.
+
+    Args:
+        data: Parsed community document
+
+    Returns:
+        MicrobialCommunity instance
+    """
+    from communitymech.datamodel.communitymech import MicrobialCommunity
+
+    return _compile_builders()[MicrobialCommunity](data)
+
+
+def load_community_file(path: Path) -> "model.MicrobialCommunity":
+    """
+    Parse and build a community YAML file.
+
+    Args:
+        path: Path to a community YAML file
+
+    Returns:
+        MicrobialCommunity instance
+    """
+    with open(path, "rb") as f:
+        return load_community(yaml.load(f, Loader=SafeLoader))
+
+
+def main():
+    """CLI for checking that community files build into the datamodel."""
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(
+        description="Build community YAML files into datamodel objects"
+    )
+    parser.add_argument(
+        "yaml_files",
+        nargs="*",
+        help="Community YAML files (default: all files in --communities-dir)",
+    )
+    parser.add_argument(
+        "--communities-dir",
+        default="kb/communities",
+        help="Directory containing community YAML files",
+    )
+
+    args = parser.parse_args()
+
+    yaml_files = [Path(f) for f in args.yaml_files]
+    if not yaml_files:
+        yaml_files = sorted(Path(args.communities_dir).glob("*.yaml"))
+
+    failed = 0
+    for yaml_file in yaml_files:
+        try:
+            load_community_file(yaml_file)
+        except Exception as e:
+            failed += 1
+            print(f"  ✗ {yaml_file.name}: {e}")
+
+    print(f"\n{len(yaml_files) - failed} of {len(yaml_files)} communities built into the datamodel")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
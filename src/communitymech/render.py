@@ -5,11 +5,25 @@ Generates individual HTML pages for each community with full metadata,
 taxonomy, ecological interactions, and evidence.
 """
 
+import contextlib
+import functools
+import hashlib
+import json
+import os
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Tuple
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Content-hash manifest written to the cache directory by incremental renders
+RENDER_MANIFEST = "manifest.json"
+
 
 class CommunityRenderer:
     """Render community YAML files to HTML pages."""
@@ -25,15 +39,21 @@ class CommunityRenderer:
             # Default to templates directory relative to this file
             template_dir = Path(__file__).parent / "templates"
 
+        self.template_dir = template_dir
         self.env = Environment(
             loader=FileSystemLoader(str(template_dir)),
             autoescape=select_autoescape(["html", "xml"]),
+            # Templates do not change during a render run; skip the
+            # freshness stat on every lookup
+            auto_reload=False,
         )
+        self.community_template = self.env.get_template("community.html")
 
     def render_community(
         self,
         yaml_path: Path,
         output_path: Optional[Path] = None,
+        community: Optional[Dict[str, Any]] = None,
     ) -> str:
         """
         Render a single community YAML to HTML.
@@ -41,28 +61,25 @@ class CommunityRenderer:
         Args:
             yaml_path: Path to community YAML file
             output_path: Path to output HTML file (optional)
+            community: Already-parsed contents of yaml_path (optional; parsed
+                from the file if not given)
 
         Returns:
             Rendered HTML string
         """
         # Load community data
-        with open(yaml_path) as f:
-            community = yaml.safe_load(f)
-
-        # Load template
-        template = self.env.get_template("community.html")
+        if community is None:
+            community = _load_yaml(yaml_path)
 
         # Render
-        html = template.render(
+        html = self.community_template.render(
             community=community,
             source_file=yaml_path.name,
         )
 
         # Write to file if output path provided
         if output_path:
-            output_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(output_path, "w") as f:
-                f.write(html)
+            _write_html(output_path, html)
             print(f"  ✓ {yaml_path.name} → {output_path}")
 
         return html
@@ -71,218 +88,242 @@ class CommunityRenderer:
         self,
         communities_dir: Path = Path("kb/communities"),
         output_dir: Path = Path("docs/communities"),
+        workers: Optional[int] = None,
+        cache_dir: Optional[Path] = None,
     ) -> None:
         """
         Render all community YAML files to HTML.
 
+        Every page is rendered unless ``cache_dir`` is given. In that case a
+        page is skipped when its YAML, the templates and this module have the
+        same content hashes as when it was last rendered and the page itself
+        is unchanged. The index is always regenerated.
+
         Args:
             communities_dir: Directory containing community YAML files
             output_dir: Directory for output HTML files
+            workers: Number of worker processes (default: CPU count;
+                1 renders in this process)
+            cache_dir: Directory for the content-hash manifest used to skip
+                unchanged pages (default: render every page)
         """
-        yaml_files = sorted(communities_dir.glob("*.yaml"))
-
-        print(f"\nRendering {len(yaml_files)} communities to HTML...")
-
-        for yaml_file in yaml_files:
-            try:
-                output_file = output_dir / f"{yaml_file.stem}.html"
-                self.render_community(yaml_file, output_file)
-            except Exception as e:
-                print(f"  ✗ {yaml_file.name}: {e}")
-
-        print(f"\n✅ Rendered {len(yaml_files)} communities to {output_dir}")
+        # DirEntry.is_file() uses the type from the directory listing, so
+        # this needs no per-file stat
+        with os.scandir(communities_dir) as entries:
+            yaml_files = sorted(
+                Path(entry.path)
+                for entry in entries
+                if entry.name.endswith(".yaml") and entry.is_file()
+            )
+        output_files = [output_dir / f"{yaml_file.stem}.html" for yaml_file in yaml_files]
+
+        manifest: Dict[str, Any] = {}
+        source_digests: List[Optional[str]] = [None] * len(yaml_files)
+        stale = [True] * len(yaml_files)
+        if cache_dir is not None:
+            # Content hashes, not mtimes: checkouts and archives can give a
+            # changed YAML file the same mtime as its committed page
+            manifest = _load_manifest(cache_dir / RENDER_MANIFEST)
+            dependency_digest = _dependency_digest(self.template_dir)
+            source_digests = [_file_digest(f, dependency_digest) for f in yaml_files]
+            stale = [
+                not _is_up_to_date(manifest.get(str(output_file)), digest, output_file)
+                for output_file, digest in zip(output_files, source_digests)
+            ]
+        n_stale = sum(stale)
+
+        if n_stale == len(yaml_files):
+            print(f"\nRendering {len(yaml_files)} communities to HTML...")
+        else:
+            print(f"\nRendering {n_stale} of {len(yaml_files)} communities to HTML...")
+
+        # Parse each file once; the index only needs a few top-level fields,
+        # so up-to-date pages are still read but not re-rendered
+        index_entries = []
+        n_rendered = n_failed = 0
+        workers = min(workers or os.cpu_count() or 1, n_stale)
+        with contextlib.ExitStack() as stack:
+            if workers > 1 and n_stale >= 4:
+                # Pages are independent, so render them across processes and
+                # report from here in file order to keep the output readable
+                pool = stack.enter_context(ProcessPoolExecutor(max_workers=workers))
+                render = functools.partial(
+                    _render_community_file, output_dir=output_dir, template_dir=self.template_dir
+                )
+                chunksize = max(1, len(yaml_files) // (4 * workers))
+                results = pool.map(render, yaml_files, stale, chunksize=chunksize)
+            else:
+                render = functools.partial(
+                    _render_community_file,
+                    output_dir=output_dir,
+                    template_dir=self.template_dir,
+                    renderer=self,
+                )
+                results = map(render, yaml_files, stale)
+
+            for (yaml_file, index_entry, error), output_file, digest, rendered in zip(
+                results, output_files, source_digests, stale
+            ):
+                if index_entry is not None:
+                    index_entries.append(index_entry)
+                if error is not None:
+                    n_failed += 1
+                    manifest.pop(str(output_file), None)
+                    print(f"  ✗ {yaml_file.name}: {error}")
+                elif rendered:
+                    n_rendered += 1
+                    if digest is not None:
+                        manifest[str(output_file)] = {
+                            "source": digest,
+                            "output": _file_digest(output_file),
+                        }
+                    print(f"  ✓ {yaml_file.name} → {output_file}")
+
+        if cache_dir is not None:
+            _save_manifest(cache_dir / RENDER_MANIFEST, manifest)
+
+        print(f"\n✅ Rendered {n_rendered} communities to {output_dir}")
+        if n_stale < len(yaml_files):
+            print(f"  {len(yaml_files) - n_stale} pages already up to date")
+        if n_failed:
+            print(f"  ✗ {n_failed} communities failed")
 
         # Generate index page
-        self._generate_index(yaml_files, output_dir)
+        self._generate_index(index_entries, output_dir)
 
     def _generate_index(
         self,
-        yaml_files: list[Path],
+        communities: List[Dict[str, str]],
         output_dir: Path,
     ) -> None:
-        """Generate index.html listing all communities."""
-        communities = []
-        for yaml_file in yaml_files:
-            with open(yaml_file) as f:
-                data = yaml.safe_load(f)
-                communities.append({
-                    "id": yaml_file.stem,
-                    "name": data.get("name", ""),
-                    "description": data.get("description", ""),
-                    "ecological_state": data.get("ecological_state", ""),
-                    "community_category": data.get("community_category", ""),
-                })
-
-        index_html = """<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>CommunityMech - Microbial Community Knowledge Base</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background: #f8fafc;
-            color: #1e293b;
-            line-height: 1.6;
-        }
-
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 2rem;
-        }
-
-        header {
-            background: white;
-            border-bottom: 2px solid #2563eb;
-            padding: 2rem 0;
-            margin-bottom: 2rem;
-        }
-
-        h1 {
-            color: #2563eb;
-            font-size: 2.5rem;
-            margin-bottom: 0.5rem;
-        }
-
-        .subtitle {
-            color: #64748b;
-            font-size: 1.125rem;
-        }
-
-        .community-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fill, minmax(350px, 1fr));
-            gap: 1.5rem;
-            margin-top: 2rem;
-        }
-
-        .community-card {
-            background: white;
-            border: 1px solid #e2e8f0;
-            border-radius: 8px;
-            padding: 1.5rem;
-            transition: transform 0.2s, box-shadow 0.2s;
-            text-decoration: none;
-            color: inherit;
-            display: flex;
-            flex-direction: column;
-        }
-
-        .community-card:hover {
-            transform: translateY(-2px);
-            box-shadow: 0 4px 12px rgba(0, 0, 0, 0.1);
-        }
-
-        .community-card h2 {
-            color: #2563eb;
-            font-size: 1.25rem;
-            margin-bottom: 0.5rem;
-        }
-
-        .community-card .description {
-            color: #64748b;
-            font-size: 0.875rem;
-            line-height: 1.5;
-            display: -webkit-box;
-            -webkit-line-clamp: 3;
-            -webkit-box-orient: vertical;
-            overflow: hidden;
-            flex: 1;
-        }
-
-        .card-footer {
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            margin-top: 0.75rem;
-        }
-
-        .badge {
-            display: inline-block;
-            padding: 0.25rem 0.75rem;
-            border-radius: 12px;
-            font-size: 0.75rem;
-            font-weight: 500;
-        }
-
-        .badge-engineered { background: #dbeafe; color: #1e40af; }
-        .badge-natural { background: #d1fae5; color: #065f46; }
-
-        .badge-category {
-            background: #f1f5f9;
-            color: #475569;
-            font-size: 0.7rem;
-            font-weight: 600;
-            letter-spacing: 0.05em;
-            text-transform: uppercase;
-            padding: 0.2rem 0.6rem;
-            border-radius: 10px;
-        }
-
-        footer {
-            margin-top: 3rem;
-            padding-top: 2rem;
-            border-top: 1px solid #e2e8f0;
-            text-align: center;
-            color: #64748b;
-            font-size: 0.875rem;
-        }
-    </style>
-</head>
-<body>
-    <header>
-        <div class="container">
-            <h1>CommunityMech</h1>
-            <p class="subtitle">Microbial Community Knowledge Base</p>
-        </div>
-    </header>
-
-    <main class="container">
-        <div class="community-grid">
-"""
-
-        for community in communities:
-            badge_class = "badge-engineered" if community["ecological_state"] == "ENGINEERED" else "badge-natural"
-            index_html += f"""
-            <a href="communities/{community['id']}.html" class="community-card">
-                <h2>{community['name']}</h2>
-                <p class="description">{community['description']}</p>
-                <div class="card-footer">
-                    <span class="badge {badge_class}">{community['ecological_state']}</span>
-                    <span class="badge badge-category">{community['community_category']}</span>
-                </div>
-            </a>
-"""
-
-        index_html += """
-        </div>
-    </main>
-
-    <footer>
-        <div class="container">
-            <p>Generated by CommunityMech | <a href="https://github.com/CultureBotAI/CommunityMech">View on GitHub</a></p>
-        </div>
-    </footer>
-</body>
-</html>
-"""
+        """Generate index.html listing all communities from their index entries."""
+        # Render through the shared environment so values are autoescaped
+        index_html = self.env.get_template("index.html").render(communities=communities)
 
         index_path = output_dir.parent / "index.html"  # docs/index.html
-        index_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(index_path, "w") as f:
-            f.write(index_html)
+        _write_html(index_path, index_html)
 
         print(f"  ✓ Generated index at {index_path}")
 
 
+def _index_entry(yaml_path: Path, data: Dict[str, Any]) -> Dict[str, str]:
+    """Extract the fields shown on the index page for one community."""
+    return {
+        "id": yaml_path.stem,
+        "name": data.get("name", ""),
+        "description": data.get("description", ""),
+        "ecological_state": data.get("ecological_state", ""),
+        "community_category": data.get("community_category", ""),
+    }
+
+
+def _file_digest(path: Path, salt: bytes = b"") -> Optional[str]:
+    """Hash a file's content (after ``salt``), or return None if it cannot be read."""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    digest = hashlib.blake2b(salt, digest_size=16)
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def _dependency_digest(template_dir: Path) -> bytes:
+    """Hash the templates and this module, which every page depends on."""
+    digest = hashlib.blake2b(Path(__file__).read_bytes(), digest_size=16)
+    for template in sorted(template_dir.iterdir()):
+        if template.is_file():
+            digest.update(template.name.encode())
+            digest.update(template.read_bytes())
+    return digest.digest()
+
+
+def _is_up_to_date(entry: Any, source_digest: Optional[str], output_path: Path) -> bool:
+    """Check a page's manifest entry against its current source and output hashes."""
+    if source_digest is None or not isinstance(entry, dict):
+        return False
+    if entry.get("source") != source_digest:
+        return False
+    output_digest = _file_digest(output_path)
+    return output_digest is not None and entry.get("output") == output_digest
+
+
+def _load_manifest(manifest_path: Path) -> Dict[str, Any]:
+    """Read the render manifest; a missing or corrupt manifest is empty."""
+    try:
+        with open(manifest_path, "rb") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _save_manifest(manifest_path: Path, manifest: Dict[str, Any]) -> None:
+    """Write the render manifest atomically; failing to write it is not an error."""
+    tmp_path = manifest_path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+        os.replace(tmp_path, manifest_path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            tmp_path.unlink()
+
+
+def _load_yaml(yaml_path: Path) -> Dict[str, Any]:
+    """Parse a community YAML file."""
+    with open(yaml_path, "rb") as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def _write_html(output_path: Path, html: str) -> None:
+    """Write a rendered page as UTF-8, creating its directory if needed."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    # Encode once and hand the whole page to the OS in one call
+    output_path.write_bytes(html.encode("utf-8"))
+
+
+@functools.lru_cache(maxsize=None)
+def _worker_renderer(template_dir: Path) -> CommunityRenderer:
+    """Return this process's renderer, so templates compile once per worker."""
+    return CommunityRenderer(template_dir)
+
+
+def _render_community_file(
+    yaml_path: Path,
+    render_page: bool,
+    output_dir: Path,
+    template_dir: Path,
+    renderer: Optional[CommunityRenderer] = None,
+) -> Tuple[Path, Optional[Dict[str, str]], Optional[str]]:
+    """
+    Render one community page, returning its index entry and any error message.
+
+    Worker processes leave ``renderer`` unset and use a per-process renderer
+    for ``template_dir``.
+    """
+    if renderer is None:
+        renderer = _worker_renderer(template_dir)
+
+    try:
+        community = _load_yaml(yaml_path)
+        index_entry = _index_entry(yaml_path, community)
+    except Exception as e:
+        return yaml_path, None, str(e)
+
+    if not render_page:
+        return yaml_path, index_entry, None
+
+    # Only the index entry goes back to the parent, not the whole document
+    try:
+        html = renderer.render_community(yaml_path, community=community)
+        _write_html(output_dir / f"{yaml_path.stem}.html", html)
+    except Exception as e:
+        return yaml_path, index_entry, str(e)
+
+    return yaml_path, index_entry, None
+
+
 def main():
     """CLI for HTML rendering."""
     import sys
@@ -309,6 +350,22 @@ def main():
         action="store_true",
         help="Render all communities",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for rendering (default: CPU count)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Skip pages whose YAML, templates and output are unchanged since the last run",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".cache/render",
+        help="Directory for the content-hash manifest used by --incremental",
+    )
 
     args = parser.parse_args()
 
@@ -324,6 +381,8 @@ def main():
         renderer.render_all(
             communities_dir=Path(args.communities_dir),
             output_dir=Path(args.output_dir),
+            workers=args.workers,
+            cache_dir=Path(args.cache_dir) if args.incremental else None,
         )
 
 
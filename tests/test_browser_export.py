@@ -0,0 +1,50 @@
+"""Test the browser export's per-community cache."""
+
+import pickle
+import shutil
+from pathlib import Path
+
+from communitymech.export.browser_export import CACHE_VERSION, BrowserExporter
+
+
+COMMUNITIES = ["Synechococcus_Ecoli_SPC.yaml", "DVM_Triculture.yaml"]
+
+
+def _export(communities_dir: Path, output: Path, cache_dir=None) -> bytes:
+    exporter = BrowserExporter(communities_dir=communities_dir, cache_dir=cache_dir)
+    exporter.export_all(output_path=output, workers=1)
+    return output.read_bytes()
+
+
+def test_corrupt_cache_entries_are_misses(tmp_path):
+    """Unreadable or wrongly shaped cache entries are re-parsed, not fatal."""
+    communities_dir = tmp_path / "communities"
+    communities_dir.mkdir()
+    for name in COMMUNITIES:
+        shutil.copy(Path("kb/communities") / name, communities_dir / name)
+
+    expected = _export(communities_dir, tmp_path / "uncached.js")
+
+    cache_dir = tmp_path / "cache"
+    assert _export(communities_dir, tmp_path / "cold.js", cache_dir) == expected
+    entries = sorted((cache_dir / CACHE_VERSION).glob("*.json"))
+    assert len(entries) == len(COMMUNITIES)
+
+    # Valid JSON of the wrong shape, and bytes that are not JSON at all
+    entries[0].write_text('{"key": 42, "community": []}')
+    entries[1].write_bytes(pickle.dumps(42))
+    assert _export(communities_dir, tmp_path / "corrupt.js", cache_dir) == expected
+
+    # Both entries were rewritten and now hit
+    assert _export(communities_dir, tmp_path / "warm.js", cache_dir) == expected
+
+
+def test_unwritable_cache_dir(tmp_path):
+    """An unusable cache directory does not stop the export."""
+    communities_dir = tmp_path / "communities"
+    communities_dir.mkdir()
+    shutil.copy(Path("kb/communities") / COMMUNITIES[0], communities_dir / COMMUNITIES[0])
+    (tmp_path / "not_a_dir").write_text("")
+
+    expected = _export(communities_dir, tmp_path / "uncached.js")
+    assert _export(communities_dir, tmp_path / "out.js", tmp_path / "not_a_dir") == expected
@@ -0,0 +1,153 @@
+"""Test literature fetching and snippet matching without network access."""
+
+from pathlib import Path
+
+from communitymech.literature import LiteratureFetcher, _normalize_text, create_session
+
+
+RECORD_111 = """{n}. Nature. 2020;1(1):1-2. doi: 10.1038/x.111.
+
+Sucrose export by engineered cyanobacteria.
+
+Author information:
+(1)Example University.
+
+Synechococcus secretes sucrose that supports heterotrophs.
+
+DOI: 10.1038/x.111
+PMCID: PMC7654321
+PMID: 111  [Indexed for MEDLINE]"""
+
+RECORD_222 = """{n}. Science. 2021;2(2):3-4.
+
+Direct interspecies electron transfer.
+
+Geobacter donates electrons to Methanosaeta.
+
+PMID: 222"""
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    """Serve efetch text for known PMIDs, recording each request."""
+
+    records = {"111": RECORD_111, "222": RECORD_222}
+
+    def __init__(self):
+        self.calls = []
+
+    def _efetch(self, ids):
+        records = [
+            self.records[pmid].format(n=n)
+            for n, pmid in enumerate((p for p in ids.split(",") if p in self.records), 1)
+        ]
+        return FakeResponse("\n\n\n".join(records) + "\n")
+
+    def get(self, url, params=None, timeout=None):
+        self.calls.append(("get", params["id"]))
+        return self._efetch(params["id"])
+
+    def post(self, url, data=None, timeout=None):
+        self.calls.append(("post", data["id"]))
+        return self._efetch(data["id"])
+
+
+def test_fetch_pubmed_abstracts_splits_batch(tmp_path):
+    """A batched efetch is split per PMID and cached as single fetches would be."""
+    session = FakeSession()
+    fetcher = LiteratureFetcher(cache_dir=str(tmp_path / "batch"), session=session)
+
+    abstracts = fetcher.fetch_pubmed_abstracts(["PMID:111", "222", "333"])
+
+    assert session.calls == [("post", "111,222,333")]
+    assert set(abstracts) == {"111", "222", "333"}
+    assert abstracts["333"] is None
+
+    # The PMCID line stays inside its record rather than starting a new one
+    assert "PMCID: PMC7654321" in abstracts["111"]
+    assert "Geobacter" not in abstracts["111"]
+    assert abstracts["222"].startswith("1. Science.")
+
+    single = LiteratureFetcher(cache_dir=str(tmp_path / "single"), session=FakeSession())
+    for pmid in ("111", "222"):
+        expected = single.fetch_pubmed_abstract(pmid)
+        assert abstracts[pmid] == expected
+        assert (tmp_path / "batch" / f"pmid_{pmid}.txt").read_text() == expected
+    assert not (tmp_path / "batch" / "pmid_333.txt").exists()
+
+    # Cached PMIDs are not requested again
+    cached = fetcher.fetch_pubmed_abstracts(["111", "222"])
+    assert cached == {pmid: abstracts[pmid] for pmid in ("111", "222")}
+    assert len(session.calls) == 1
+
+
+def test_fetch_doi_metadata_returns_copies(tmp_path):
+    """Changing returned DOI metadata does not change the cached copy."""
+    (tmp_path / "doi_10.1038_x.111.json").write_text('{"status": "ok"}')
+    fetcher = LiteratureFetcher(cache_dir=str(tmp_path), session=FakeSession())
+
+    first = fetcher.fetch_doi_metadata("doi:10.1038/x.111")
+    first["status"] = "changed"
+    assert fetcher.fetch_doi_metadata("10.1038/x.111") == {"status": "ok"}
+
+
+def test_session_retries_batched_post():
+    """Batched efetch POSTs are retried on rate limiting and server errors."""
+    retry = create_session().get_adapter("https://eutils.ncbi.nlm.nih.gov").max_retries
+    for status in (429, 503):
+        assert retry.is_retry("POST", status)
+        assert retry.is_retry("GET", status)
+
+
+ABSTRACT = (
+    "Cyanobacteria fix carbon dioxide through photosynthesis. We previously engineered "
+    "a model cyanobacterium, Synechococcus elongatus PCC 7942, to secrete the bulk of "
+    "the carbon it fixes as sucrose. Co-culture with Escherichia coli supported "
+    "heterotrophic growth without added carbon sources."
+)
+SNIPPET = "engineered a model cyanobacterium, Synechococcus elongatus PCC 7942"
+
+
+def test_normalize_text():
+    """Whitespace runs, including non-breaking spaces, collapse to one space."""
+    text = "  Sucrose\u00a0export\tby\n\n engineered  Cyanobacteria "
+    assert _normalize_text(text) == " ".join(text.split()).lower()
+    assert _normalize_text(text) == "sucrose export by engineered cyanobacteria"
+
+
+def test_validate_evidence_snippet(tmp_path):
+    """Exact and lightly edited snippets are accepted; unrelated text is rejected."""
+    fetcher = LiteratureFetcher(cache_dir=str(tmp_path), session=FakeSession())
+
+    assert fetcher.validate_evidence_snippet(SNIPPET.upper(), ABSTRACT)
+    assert fetcher.validate_evidence_snippet("  engineered a model\ncyanobacterium ", ABSTRACT)
+    # One substituted character in a 67-character snippet
+    assert fetcher.validate_evidence_snippet(SNIPPET.replace("model", "modal"), ABSTRACT)
+
+    assert not fetcher.validate_evidence_snippet(
+        "Methanogens consume hydrogen from syntrophs", ABSTRACT
+    )
+    assert not fetcher.validate_evidence_snippet("", ABSTRACT)
+    assert not fetcher.validate_evidence_snippet(SNIPPET, "")
+
+
+def test_validate_snippet_in_repeated_text(tmp_path):
+    """An edited snippet is found even when the source repeats parts of it."""
+    fetcher = LiteratureFetcher(cache_dir=str(tmp_path), session=FakeSession())
+    source = Path("references_cache/PMID_30254121.md").read_text()
+
+    # The DOI recurs throughout the cached record
+    normalized = _normalize_text(source)
+    assert normalized.count("10.1128/mbio") > 1
+    start = normalized.index("1. mbio. 2018 sep 25")
+    snippet = normalized[start:start + 140]
+    snippet = snippet.replace("the cost", "the cst").replace("10.1128/mbio", "10.1128/fbio")
+
+    assert fetcher.validate_evidence_snippet(snippet, source)
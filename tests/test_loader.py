@@ -0,0 +1,140 @@
+"""Test fast construction of datamodel objects from community YAML."""
+
+import pytest
+from pathlib import Path
+
+from communitymech.datamodel.communitymech import (
+    EcologicalInteraction,
+    EvidenceItem,
+    EvidenceItemSupportEnum,
+    FunctionalRoleEnum,
+    MetaboliteDescriptor,
+    MicrobialCommunity,
+    TaxonomicComposition,
+    Term,
+)
+from communitymech.loader import build, build_many, construct, get_term, load_community_file
+
+
+def test_load_all_communities():
+    """Every community in the knowledge base builds into datamodel objects."""
+    yaml_files = sorted(Path("kb/communities").glob("*.yaml"))
+    assert yaml_files
+
+    for yaml_file in yaml_files:
+        community = load_community_file(yaml_file)
+        assert isinstance(community, MicrobialCommunity)
+        for taxon in community.taxonomy:
+            assert isinstance(taxon, TaxonomicComposition)
+
+
+def test_load_synechococcus_ecoli():
+    """Nested slots are coerced to their declared classes and enums."""
+    community = load_community_file(Path("kb/communities/Synechococcus_Ecoli_SPC.yaml"))
+
+    assert community.name == "Synechococcus-E.coli Synthetic Photosynthetic Consortium"
+    assert community.ecological_state == "ENGINEERED"
+
+    synecho = community.taxonomy[0]
+    assert synecho.taxon_term.term.id == "NCBITaxon:32046"
+    assert isinstance(synecho.functional_role[0], FunctionalRoleEnum)
+    assert "PRIMARY_PRODUCER" in synecho.functional_role
+
+    evidence = community.ecological_interactions[0].evidence[0]
+    assert isinstance(evidence, EvidenceItem)
+    assert isinstance(evidence.supports, EvidenceItemSupportEnum)
+    assert evidence.reference == "PMID:28127397"
+
+
+def test_build_matches_generated_constructor():
+    """Builders produce the same slot values as the generated classes."""
+    evidence = {
+        "reference": "PMID:28127397",
+        "supports": "SUPPORT",
+        "evidence_source": "IN_VITRO",
+        "snippet": "sucrose export",
+        "confidence_score": 1,
+    }
+    metabolite = {"preferred_term": "sucrose", "term": {"id": "CHEBI:17992", "label": "sucrose"}}
+
+    assert build(EvidenceItem, evidence).__dict__ == EvidenceItem(**evidence).__dict__
+    assert (
+        build(MetaboliteDescriptor, metabolite).__dict__
+        == MetaboliteDescriptor(**metabolite).__dict__
+    )
+
+    batch = build_many(EvidenceItem, [evidence, dict(evidence, supports="REFUTE")])
+    assert [e.__dict__ for e in batch] == [
+        EvidenceItem(**evidence).__dict__,
+        EvidenceItem(**dict(evidence, supports="REFUTE")).__dict__,
+    ]
+
+
+def test_inlined_lists_stay_lists():
+    """Inlined multivalued slots are lists, where the generated classes key them into dicts."""
+    evidence = {
+        "reference": "PMID:28127397",
+        "supports": "SUPPORT",
+        "evidence_source": "IN_VITRO",
+        "snippet": "sucrose export",
+    }
+    interaction = {
+        "name": "Sucrose cross-feeding",
+        "metabolites": [
+            {"preferred_term": "sucrose", "term": {"id": "CHEBI:17992", "label": "sucrose"}}
+        ],
+        "downstream": [{"target": "Heterotrophic growth"}],
+        "evidence": [evidence, dict(evidence, supports="PARTIAL")],
+    }
+
+    built = build(EcologicalInteraction, interaction)
+    for slot in ("metabolites", "downstream", "evidence"):
+        assert isinstance(getattr(built, slot), list)
+    assert [e.supports.code.text for e in built.evidence] == ["SUPPORT", "PARTIAL"]
+
+    # Keyed by reference, so the second item with the same reference wins
+    generated = EcologicalInteraction(**interaction)
+    for slot in ("metabolites", "downstream", "evidence"):
+        assert isinstance(getattr(generated, slot), dict)
+    assert list(generated.evidence) == ["PMID:28127397"]
+
+
+def test_terms_are_shared():
+    """Identical ontology terms resolve to a single Term instance."""
+    metabolite = {"preferred_term": "sucrose", "term": {"id": "CHEBI:17992", "label": "sucrose"}}
+
+    first = build(MetaboliteDescriptor, metabolite)
+    second = build(MetaboliteDescriptor, dict(metabolite, preferred_term="Sucrose"))
+    assert first.term is second.term
+    assert get_term("CHEBI:17992", "sucrose") is first.term
+
+    # Shared terms are read-only but still compare equal to plain Terms
+    with pytest.raises(AttributeError, match="read-only"):
+        first.term.label = "changed"
+    assert second.term.label == "sucrose"
+    assert first.term == Term(id="CHEBI:17992", label="sucrose")
+
+
+def test_construct_trusted_values():
+    """construct() assigns slots directly and fills generated defaults."""
+    term = construct(Term, id="CHEBI:17992", label="sucrose")
+    assert term.__dict__ == Term(id="CHEBI:17992", label="sucrose").__dict__
+
+    taxon = construct(TaxonomicComposition, taxon_term=None)
+    assert taxon.functional_role == [] and taxon.evidence == []
+    assert taxon.evidence is not construct(TaxonomicComposition).evidence
+
+
+def test_build_rejects_invalid_data():
+    """Missing required slots and unknown slots raise ValueError."""
+    with pytest.raises(ValueError, match="snippet must be supplied"):
+        build(
+            EvidenceItem,
+            {"reference": "PMID:1", "supports": "SUPPORT", "evidence_source": "IN_VITRO"},
+        )
+
+    with pytest.raises(ValueError, match="Unknown arguments"):
+        build(
+            MetaboliteDescriptor,
+            {"preferred_term": "x", "term": {"id": "a", "label": "b"}, "extra": 1},
+        )
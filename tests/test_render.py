@@ -0,0 +1,56 @@
+"""Test full and incremental rendering of community pages."""
+
+import os
+import shutil
+from pathlib import Path
+
+from communitymech.render import CommunityRenderer
+
+
+COMMUNITY = "Synechococcus_Ecoli_SPC.yaml"
+
+
+def _setup(tmp_path: Path) -> Path:
+    communities_dir = tmp_path / "communities"
+    communities_dir.mkdir()
+    shutil.copy(Path("kb/communities") / COMMUNITY, communities_dir / COMMUNITY)
+    return communities_dir
+
+
+def test_incremental_render_uses_content_not_mtime(tmp_path, capsys):
+    """A YAML edit that keeps the file's mtime still re-renders its page."""
+    communities_dir = _setup(tmp_path)
+    yaml_path = communities_dir / COMMUNITY
+    output_dir = tmp_path / "out" / "communities"
+    page = output_dir / "Synechococcus_Ecoli_SPC.html"
+    cache_dir = tmp_path / "cache"
+    renderer = CommunityRenderer()
+
+    renderer.render_all(communities_dir, output_dir, workers=1, cache_dir=cache_dir)
+    renderer.render_all(communities_dir, output_dir, workers=1, cache_dir=cache_dir)
+    assert "Rendered 0 communities" in capsys.readouterr().out
+
+    stat = yaml_path.stat()
+    original = yaml_path.read_text()
+    yaml_path.write_text(original.replace("Synechococcus", "Synechocystis", 1))
+    os.utime(yaml_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.utime(page, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    renderer.render_all(communities_dir, output_dir, workers=1, cache_dir=cache_dir)
+    assert "Rendered 1 communities" in capsys.readouterr().out
+    assert "Synechocystis" in page.read_text()
+
+
+def test_render_all_counts_failures(tmp_path, capsys):
+    """Failed pages are reported separately and rendered by default on every run."""
+    communities_dir = _setup(tmp_path)
+    (communities_dir / "Broken.yaml").write_text("name: [unclosed\n")
+    output_dir = tmp_path / "out" / "communities"
+    renderer = CommunityRenderer()
+
+    for _ in range(2):
+        renderer.render_all(communities_dir, output_dir, workers=1)
+        out = capsys.readouterr().out
+        assert "Rendered 1 communities" in out
+        assert "1 communities failed" in out
+        assert "already up to date" not in out